@@ -0,0 +1,171 @@
+"""
+Degree-of-separation analytics over the degrees co-star graph.
+
+Runs a breadth-first search from every person (or a random sample of
+people) across a process pool and reports the distribution of
+separations, per-person eccentricity and an estimate of the diameter.
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import random
+import time
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Separation histogram, eccentricity and diameter.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--sample", type=int,
+                        help="search from this many random people only")
+    parser.add_argument("--seed", type=int, help="seed for --sample")
+    parser.add_argument("--eccentricity", metavar="FILE",
+                        help="write each source's eccentricity to a CSV file")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory, compact=True)
+    print("Data loaded.")
+
+    sources = range(len(degrees.graph.person_ids))
+    if args.sample is not None and args.sample < len(sources):
+        sources = random.Random(args.seed).sample(sources, args.sample)
+
+    start = time.perf_counter()
+    histogram, eccentricities = analyze(sources, args.workers,
+                                        args.directory)
+    elapsed = time.perf_counter() - start
+
+    total = sum(histogram[1:])
+    print(f"Searched from {len(eccentricities)} people in {elapsed:.2f}s "
+          f"({len(eccentricities) / elapsed:.1f} sources/sec) "
+          f"with {args.workers} workers")
+    print("Degrees of separation:")
+    for distance, count in enumerate(histogram):
+        if distance == 0:
+            continue
+        share = count / total if total else 0
+        print(f"  {distance:>3}: {count:>14} pairs ({share:7.2%})")
+
+    if eccentricities:
+        diameter = max(eccentricities.values())
+        if len(eccentricities) < len(degrees.graph.person_ids):
+            print(f"Diameter: at least {diameter} (sampled)")
+        else:
+            print(f"Diameter: {diameter}")
+
+    if args.eccentricity:
+        with open(args.eccentricity, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["person_id", "name", "eccentricity"])
+            for person, eccentricity in sorted(eccentricities.items()):
+                person_id = degrees.graph.person_ids[person]
+                writer.writerow([person_id, degrees.people[person_id]["name"],
+                                 eccentricity])
+
+
+def analyze(sources, workers, directory=None):
+    """
+    Runs a breadth-first search from each person index in `sources`.
+
+    Returns (histogram, eccentricities): histogram[d] is the number of
+    (source, person) pairs at distance d, and eccentricities maps each
+    source to its largest distance within its component.
+
+    Workers read the graph loaded in this process. Where processes are
+    forked they inherit it copy-on-write; otherwise each worker loads
+    `directory` once at startup (from its snapshot when available).
+    """
+    sources = list(sources)
+    histogram = []
+    eccentricities = {}
+
+    if workers <= 1:
+        results = [_search_shard(sources)]
+    else:
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            initializer, initargs = None, ()
+        else:
+            context = multiprocessing.get_context()
+            initializer, initargs = _load_worker, (directory,)
+
+        # Several shards per worker keep the pool balanced
+        size = max(1, len(sources) // (workers * 8))
+        shards = [sources[i:i + size] for i in range(0, len(sources), size)]
+        pool = context.Pool(workers, initializer=initializer,
+                            initargs=initargs)
+        with pool:
+            results = list(pool.imap_unordered(_search_shard, shards))
+
+    for result in results:
+        for source, distances in result:
+            eccentricities[source] = len(distances) - 1
+            if len(distances) > len(histogram):
+                histogram.extend([0] * (len(distances) - len(histogram)))
+            for distance, count in enumerate(distances):
+                histogram[distance] += count
+    return histogram, eccentricities
+
+
+def _load_worker(directory):
+    """
+    Loads the compact graph in a worker that was not forked.
+    """
+    degrees.load_data(directory, compact=True)
+
+
+def _search_shard(sources):
+    """
+    Returns (source, distances) for each source, where distances[d] is
+    the number of people at distance d from the source.
+    """
+    return [(source, separation_counts(source)) for source in sources]
+
+
+def separation_counts(source):
+    """
+    Returns a list whose d-th entry is the number of people exactly d
+    co-star steps away from the person at index `source`.
+    """
+    graph = degrees.graph
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    # A movie links all of its stars, so each is expanded at most once
+    seen_people = bytearray(len(graph.person_ids))
+    seen_movies = bytearray(len(graph.movie_ids))
+    seen_people[source] = 1
+    frontier = [source]
+    counts = [1]
+
+    while True:
+        next_frontier = []
+        for person in frontier:
+            start = person_offsets[person]
+            end = person_offsets[person + 1]
+            for movie in person_movies[start:end]:
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                first = movie_offsets[movie]
+                last = movie_offsets[movie + 1]
+                for star in movie_stars[first:last]:
+                    if not seen_people[star]:
+                        seen_people[star] = 1
+                        next_frontier.append(star)
+        if not next_frontier:
+            return counts
+        counts.append(len(next_frontier))
+        frontier = next_frontier
+
+
+if __name__ == "__main__":
+    main()
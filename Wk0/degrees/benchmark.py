@@ -0,0 +1,345 @@
+"""
+Benchmarks for the degrees search algorithms and data structures.
+
+Usage: python benchmark.py search [directory]
+       python benchmark.py frontier
+       python benchmark.py memory [directory]
+       python benchmark.py startup [directory]
+       python benchmark.py names [directory]
+"""
+import os
+import random
+import string
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import degrees
+import snapshot
+from compact import CompactGraph
+from fuzzy import NameIndex
+from landmarks import Landmarks
+from util import Node, StackFrontier, QueueFrontier
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_synthetic(people_count=100000, movie_count=40000, cast_size=(2, 8),
+                   seed=0):
+    """
+    Fill the degrees dataset with a random co-star graph.
+    """
+    rng = random.Random(seed)
+    reset()
+
+    for i in range(people_count):
+        person_id = str(i)
+        degrees.people[person_id] = {
+            "name": f"Person {i}",
+            "birth": "",
+            "movies": set()
+        }
+        degrees.names[f"person {i}"] = {person_id}
+
+    for i in range(movie_count):
+        movie_id = f"m{i}"
+        stars = {
+            str(rng.randrange(people_count))
+            for _ in range(rng.randint(*cast_size))
+        }
+        degrees.movies[movie_id] = {
+            "title": f"Movie {i}",
+            "year": "",
+            "stars": stars
+        }
+        for person_id in stars:
+            degrees.people[person_id]["movies"].add(movie_id)
+
+
+def reset():
+    """
+    Empty the loaded degrees dataset.
+    """
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.graph = None
+    degrees.landmarks = None
+
+
+def compact_synthetic():
+    """
+    Convert the loaded dict-of-sets dataset to a CompactGraph.
+    """
+    degrees.graph = CompactGraph.from_pairs(
+        list(degrees.people), list(degrees.movies),
+        ((person_id, movie_id)
+         for person_id, person in degrees.people.items()
+         for movie_id in person["movies"])
+    )
+
+
+def random_pairs(count, seed=0):
+    """
+    Returns `count` random (source, target) pairs of person ids.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [(rng.choice(person_ids), rng.choice(person_ids))
+            for _ in range(count)]
+
+
+def compare_searches(pairs):
+    """
+    Runs every search algorithm over `pairs`, checks they agree
+    on path lengths, and prints expanded-node counts and wall time.
+    """
+    lengths = {}
+    for name, search in sorted(degrees.SEARCHES.items()):
+        if search is degrees.landmark_shortest_path and not degrees.landmarks:
+            continue
+        stats = {"expanded": 0}
+        start = time.perf_counter()
+        for source, target in pairs:
+            path = search(source, target, stats=stats)
+            length = None if path is None else len(path)
+            if lengths.setdefault((source, target), length) != length:
+                sys.exit(f"{name} disagrees on {source} -> {target}")
+        elapsed = time.perf_counter() - start
+        print(f"  {name:>14}: {stats['expanded']:>10} expanded, "
+              f"{elapsed:8.3f}s")
+
+
+def benchmark_search(directory):
+    """
+    Compares the search algorithms on a dataset and a synthetic graph,
+    over both the dict-of-sets and compact representations.
+    """
+    for compact in (False, True):
+        reset()
+        degrees.load_data(directory, compact=compact)
+        if compact:
+            degrees.landmarks = Landmarks.build(degrees.graph)
+        pairs = [(source, target)
+                 for source in sorted(degrees.people)
+                 for target in sorted(degrees.people)]
+        print(f"Dataset '{directory}', compact={compact} "
+              f"({len(pairs)} queries)")
+        compare_searches(pairs)
+
+    load_synthetic()
+    pairs = random_pairs(50)
+    print(f"Synthetic graph ({len(degrees.people)} people, "
+          f"{len(pairs)} queries)")
+    compare_searches(pairs)
+    compact_synthetic()
+    start = time.perf_counter()
+    degrees.landmarks = Landmarks.build(degrees.graph)
+    elapsed = time.perf_counter() - start
+    print(f"Synthetic graph, compact=True "
+          f"({len(degrees.landmarks.people)} landmarks in {elapsed:.2f}s)")
+    compare_searches(pairs)
+
+
+def benchmark_memory(directory):
+    """
+    Reports load time and memory held by each representation: the
+    Python allocations tracemalloc traces after loading and at peak,
+    and the peak resident set size of a fresh process loading it, less
+    that of one which only imports degrees.
+    """
+    # Measured first: on Linux a child process starts with its parent's
+    # peak resident size, so the parent must not have loaded anything
+    baseline = peak_resident(directory, None)
+    residents = {compact: peak_resident(directory, compact)
+                 for compact in (False, True)}
+    for compact in (False, True):
+        reset()
+        start = time.perf_counter()
+        degrees.load_data(directory, compact=compact, use_snapshot=False)
+        elapsed = time.perf_counter() - start
+
+        reset()
+        tracemalloc.start()
+        degrees.load_data(directory, compact=compact, use_snapshot=False)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        resident = residents[compact]
+        if resident is None or baseline is None:
+            resident = "        ?"
+        else:
+            resident = f"{(resident - baseline) / 2 ** 20:9.2f}"
+        print(f"  compact={compact!s:>5}: loaded in {elapsed:7.3f}s, "
+              f"{current / 2 ** 20:9.2f} MiB traced, "
+              f"{peak / 2 ** 20:9.2f} MiB traced peak, "
+              f"{resident} MiB peak resident")
+
+
+def peak_resident(directory, compact):
+    """
+    Returns the peak resident set size in bytes of a new interpreter
+    loading the dataset from its CSV files, or only importing degrees
+    if `compact` is None. Returns None where it cannot be measured.
+    """
+    code = "import degrees, loader\n"
+    if compact is not None:
+        code += (f"degrees.load_data({os.path.abspath(directory)!r}, "
+                 f"compact={compact}, use_snapshot=False)\n")
+    code += "print(loader.peak_memory())"
+    output = subprocess.run([sys.executable, "-c", code], check=True,
+                            cwd=HERE, capture_output=True, text=True).stdout
+    peak = output.split()[-1]
+    return None if peak == "None" else int(peak)
+
+
+def benchmark_frontier(sizes=(10 ** 5, 10 ** 6)):
+    """
+    Times add, membership and remove on frontiers of increasing size.
+    Per-operation times should stay flat as the frontier grows.
+    """
+    for frontier_class in (QueueFrontier, StackFrontier):
+        print(frontier_class.__name__)
+        for size in sizes:
+            frontier = frontier_class()
+            nodes = [Node(state=i, parent=None, action=None)
+                     for i in range(size)]
+
+            start = time.perf_counter()
+            for node in nodes:
+                frontier.add(node)
+            add = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(0, 2 * size, 2):
+                frontier.contains_state(i)
+            contains = time.perf_counter() - start
+
+            start = time.perf_counter()
+            while not frontier.empty():
+                frontier.remove()
+            remove = time.perf_counter() - start
+
+            print(f"  {size:>9} nodes: "
+                  f"add {add / size * 1e9:6.0f}ns, "
+                  f"contains {contains / size * 1e9:6.0f}ns, "
+                  f"remove {remove / size * 1e9:6.0f}ns per op")
+
+
+def benchmark_startup(directory):
+    """
+    Times a fresh process loading the dataset from its CSV files (cold)
+    and from a snapshot (warm), for both representations.
+    """
+    for compact in (False, True):
+        path = snapshot.snapshot_path(directory, compact)
+        if os.path.exists(path):
+            os.remove(path)
+        cold = time_startup(directory, compact)
+
+        subprocess.run(
+            [sys.executable, "degrees.py", os.path.abspath(directory), "--build-snapshot"]
+            + (["--compact"] if compact else []),
+            check=True, stdout=subprocess.DEVNULL, cwd=HERE
+        )
+        warm = time_startup(directory, compact)
+        print(f"  compact={compact!s:>5}: cold {cold:7.3f}s, "
+              f"warm {warm:7.3f}s, snapshot {os.path.getsize(path)} bytes")
+
+
+def time_startup(directory, compact, repeat=3):
+    """
+    Returns the best wall time of a new interpreter running load_data.
+    """
+    code = (f"import degrees; degrees.load_data("
+            f"{os.path.abspath(directory)!r}, compact={compact})")
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=HERE)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_names(directory, queries=1000, seed=0):
+    """
+    Reports NameIndex build time and memory, lookup latency and recall
+    for names with one random typo, and the latency of single-word
+    queries such as a first name on its own.
+    """
+    reset()
+    degrees.load_data(directory)
+
+    start = time.perf_counter()
+    index = NameIndex(degrees.names)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    index = NameIndex(degrees.names)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {len(index.keys)} names indexed in {elapsed:.3f}s, "
+          f"{current / 2 ** 20:.2f} MiB")
+
+    rng = random.Random(seed)
+    keys = sorted(degrees.names)
+    typos = []
+    for _ in range(queries):
+        key = rng.choice(keys)
+        i = rng.randrange(len(key))
+        typos.append((key, key[:i] + rng.choice(string.ascii_lowercase)
+                      + key[i + 1:]))
+
+    found = 0
+    start = time.perf_counter()
+    for key, typo in typos:
+        if any(match == key for match, _ in index.search(typo)):
+            found += 1
+    elapsed = time.perf_counter() - start
+    print(f"  typo lookup: {elapsed / queries * 1e3:.3f}ms per query, "
+          f"{found / queries:.1%} recall")
+
+    # Common first names are the slowest words to look up alone
+    words = [key.split()[0] for key, _ in typos]
+    start = time.perf_counter()
+    slowest = 0
+    for word in words:
+        query_start = time.perf_counter()
+        index.search(word)
+        slowest = max(slowest, time.perf_counter() - query_start)
+    elapsed = time.perf_counter() - start
+    print(f"  single-word lookup: {elapsed / queries * 1e3:.3f}ms per query, "
+          f"slowest {slowest * 1e3:.3f}ms")
+
+    start = time.perf_counter()
+    for key, _ in typos:
+        index.prefix(key[:3])
+    elapsed = time.perf_counter() - start
+    print(f"  prefix lookup: {elapsed / queries * 1e3:.3f}ms per query")
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("search", "frontier",
+                                                 "memory", "startup", "names"):
+        sys.exit("Usage: python benchmark.py search [directory]\n"
+                 "       python benchmark.py frontier\n"
+                 "       python benchmark.py memory [directory]\n"
+                 "       python benchmark.py startup [directory]\n"
+                 "       python benchmark.py names [directory]")
+    directory = sys.argv[2] if len(sys.argv) > 2 else "small"
+    if sys.argv[1] == "search":
+        benchmark_search(directory)
+    elif sys.argv[1] == "memory":
+        benchmark_memory(directory)
+    elif sys.argv[1] == "startup":
+        benchmark_startup(directory)
+    elif sys.argv[1] == "names":
+        benchmark_names(directory)
+    else:
+        benchmark_frontier()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import json
+import sqlite3
+from collections import OrderedDict
+
+# Marks a pair missing from the cache, since None is a cached result
+MISSING = object()
+
+
+class PathCache():
+    """
+    Bounded LRU cache of shortest_path results, with an optional
+    sqlite file as a second, unbounded tier.
+
+    Paths are undirected, so (source, target) and (target, source)
+    share one entry, stored from the smaller id to the larger one.
+
+    The sqlite tier records the dataset `version` it was filled from,
+    and is cleared when it is opened with a different one. That is the
+    only check: the in-memory tier starts empty with each cache, and a
+    cache is not told when the dataset is reloaded, so a new one should
+    be made instead.
+    """
+
+    def __init__(self, maxsize=1024, filename=None, version=None):
+        self.maxsize = maxsize
+        self.version = version
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db = None
+        if filename is not None:
+            self.db = sqlite3.connect(filename)
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta "
+                            "(key TEXT PRIMARY KEY, value TEXT)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS paths "
+                            "(source TEXT, target TEXT, path TEXT, "
+                            "PRIMARY KEY (source, target))")
+            row = self.db.execute(
+                "SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != version:
+                self.invalidate(version)
+
+    def invalidate(self, version=None):
+        """
+        Drops every cached path and records the dataset version the
+        cache now belongs to.
+        """
+        self.version = version
+        self.entries.clear()
+        if self.db is not None:
+            with self.db:
+                self.db.execute("DELETE FROM paths")
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES "
+                                "('version', ?)", (version,))
+
+    def get(self, source, target):
+        """
+        Returns the cached path from source to target, or MISSING.
+        """
+        key = (source, target) if source <= target else (target, source)
+        path = self.entries.get(key, MISSING)
+        if path is not MISSING:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        elif self.db is not None:
+            row = self.db.execute(
+                "SELECT path FROM paths WHERE source = ? AND target = ?",
+                key).fetchone()
+            if row is not None:
+                path = json.loads(row[0])
+                if path is not None:
+                    path = [tuple(step) for step in path]
+                self._remember(key, path)
+                self.disk_hits += 1
+        if path is MISSING:
+            self.misses += 1
+            return MISSING
+        if path is None or key[0] == source:
+            return path
+        return reverse_path(key[0], path)
+
+    def put(self, source, target, path):
+        """
+        Caches the path from source to target (None if not connected).
+        """
+        key = (source, target)
+        if source > target:
+            key = (target, source)
+            if path is not None:
+                path = reverse_path(source, path)
+        self._remember(key, path)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO paths VALUES (?, ?, ?)",
+                            key + (json.dumps(path),))
+
+    def shortest_path(self, source, target, search):
+        """
+        Returns the cached path from source to target, calling
+        search(source, target) to compute it on a miss.
+        """
+        path = self.get(source, target)
+        if path is MISSING:
+            path = search(source, target)
+            self.put(source, target, path)
+        return path
+
+    def stats(self):
+        """
+        Returns the cache's hit, miss and eviction counters.
+        """
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def close(self):
+        """
+        Commits pending writes to the sqlite file and closes it.
+        """
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+    def _remember(self, key, path):
+        self.entries[key] = path
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+
+def reverse_path(source, path):
+    """
+    Returns the path from the last person of `path` back to `source`,
+    where `path` is a list of (movie_id, person_id) pairs from source.
+    """
+    people = [source] + [person for _, person in path]
+    movies = [movie for movie, _ in path]
+    return list(zip(reversed(movies), reversed(people[:-1])))
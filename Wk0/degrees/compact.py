@@ -0,0 +1,131 @@
+import pickle
+from array import array
+
+
+class CompactGraph():
+    """
+    Co-star graph with person and movie ids interned to integers.
+
+    Person <-> movie adjacency is stored in CSR form: the movies of
+    person p are person_movies[person_offsets[p]:person_offsets[p + 1]],
+    and the stars of movie m are
+    movie_stars[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_stars):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+
+    @classmethod
+    def from_pairs(cls, person_ids, movie_ids, pairs):
+        """
+        Builds a graph from lists of person and movie ids and an
+        iterable of (person_id, movie_id) star pairs. Pairs naming an
+        unknown person or movie are ignored.
+        """
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        # Intern every pair, dropping duplicates and unknown ids
+        seen = set()
+        stars_person = array("i")
+        stars_movie = array("i")
+        for person_id, movie_id in pairs:
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is None or movie is None or (person, movie) in seen:
+                continue
+            seen.add((person, movie))
+            stars_person.append(person)
+            stars_movie.append(movie)
+        del seen
+
+        person_offsets, person_movies = _csr(
+            len(person_ids), stars_person, stars_movie)
+        movie_offsets, movie_stars = _csr(
+            len(movie_ids), stars_movie, stars_person)
+        return cls(list(person_ids), list(movie_ids), person_offsets,
+                   person_movies, movie_offsets, movie_stars)
+
+    def __reduce_ex__(self, protocol):
+        arrays = (self.person_offsets, self.person_movies,
+                  self.movie_offsets, self.movie_stars)
+        if protocol >= 5:
+            # Let protocol 5 pickles store the arrays out-of-band
+            arrays = tuple(pickle.PickleBuffer(a) for a in arrays)
+        else:
+            arrays = tuple(a.tobytes() for a in arrays)
+        return _from_buffers, (self.person_ids, self.movie_ids) + arrays
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with the person at index `person`.
+        """
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        start = self.person_offsets[person]
+        end = self.person_offsets[person + 1]
+        for movie in self.person_movies[start:end]:
+            for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                yield movie, star
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people who starred
+        with a given person, using the original string ids.
+        """
+        return {
+            (self.movie_ids[movie], self.person_ids[star])
+            for movie, star in self.neighbors(self.person_index[person_id])
+        }
+
+    def decode_path(self, path):
+        """
+        Converts a path of (movie, person) index pairs back to ids.
+        """
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+def _from_buffers(person_ids, movie_ids, *buffers):
+    """
+    Rebuilds a CompactGraph from its pickled ids and array buffers.
+    """
+    # Each buffer is copied once, into an array that owns its memory,
+    # so nothing keeps a view of the snapshot file alive
+    arrays = []
+    for buffer in buffers:
+        a = array("i")
+        a.frombytes(buffer)
+        arrays.append(a)
+    return CompactGraph(person_ids, movie_ids, *arrays)
+
+
+def _csr(size, rows, columns):
+    """
+    Returns (offsets, values) arrays grouping `columns` by `rows`,
+    where every row index is below `size`.
+    """
+    offsets = array("i", [0]) * (size + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    position = array("i", offsets[:-1])
+    values = array("i", [0]) * len(rows)
+    for row, column in zip(rows, columns):
+        values[position[row]] = column
+        position[row] += 1
+    return offsets, values
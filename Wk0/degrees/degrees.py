@@ -1,6 +1,15 @@
-import csv
+import argparse
+import heapq
+import json
 import sys
+import time
 
+import loader
+import snapshot
+from cache import MISSING, PathCache
+from compact import CompactGraph
+from fuzzy import NameIndex
+from landmarks import Landmarks
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,56 +21,242 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph holding the star relation when loaded with compact=True
+graph = None
 
-def load_data(directory):
+# NameIndex over `names` used to suggest names that were not found
+name_index = None
+
+# Landmarks over `graph` used by landmark_shortest_path
+landmarks = None
+
+
+def load_data(directory, compact=False, use_snapshot=True,
+              person_filter=None, movie_filter=None, progress=None):
     """
     Load data from CSV files into memory.
+
+    If `compact` is True, the star relation is stored in a CompactGraph
+    instead of the "movies" and "stars" sets of `people` and `movies`.
+
+    If `use_snapshot` is True and the directory has a snapshot newer
+    than its CSV files (see save_snapshot), it is loaded instead.
+
+    Rows are streamed from the files, and `person_filter` and
+    `movie_filter`, if given, are called with each people.csv and
+    movies.csv row to decide whether to keep it; stars of dropped
+    people or movies are dropped too. Snapshots hold the whole dataset,
+    so they are not used when filtering. `progress` is a loader
+    progress hook called with per-file read statistics.
     """
+    global graph
+
+    filtered = person_filter is not None or movie_filter is not None
+    if use_snapshot and not filtered and snapshot.is_fresh(directory, compact):
+        data = snapshot.load(snapshot.snapshot_path(directory, compact))
+        if data is not None:
+            names.update(data["names"])
+            people.update(data["people"])
+            movies.update(data["movies"])
+            graph = data["graph"]
+            return
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    rows = loader.people_rows(directory, progress)
+    if person_filter is not None:
+        rows = filter(person_filter, rows)
+    for row in rows:
+        people[row["id"]] = {
+            "name": row["name"],
+            "birth": row["birth"]
+        }
+        if not compact:
+            people[row["id"]]["movies"] = set()
+        if row["name"].lower() not in names:
+            names[row["name"].lower()] = {row["id"]}
+        else:
+            names[row["name"].lower()].add(row["id"])
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+    rows = loader.movie_rows(directory, progress)
+    if movie_filter is not None:
+        rows = filter(movie_filter, rows)
+    for row in rows:
+        movies[row["id"]] = {
+            "title": row["title"],
+            "year": row["year"]
+        }
+        if not compact:
+            movies[row["id"]]["stars"] = set()
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    rows = loader.star_rows(directory, progress)
+    if compact:
+        graph = CompactGraph.from_pairs(
+            list(people), list(movies),
+            ((row["person_id"], row["movie_id"]) for row in rows)
+        )
+        return
+    graph = None
+    for row in rows:
+        try:
+            person = people[row["person_id"]]
+            movie = movies[row["movie_id"]]
+        except KeyError:
+            continue
+        person["movies"].add(row["movie_id"])
+        movie["stars"].add(row["person_id"])
+
+
+def year_filter(min_year=None, max_year=None):
+    """
+    Returns a movie_filter for load_data keeping movies released
+    between min_year and max_year inclusive; movies with no year are
+    dropped.
+    """
+    def keep(row):
+        if not row["year"].isdigit():
+            return False
+        year = int(row["year"])
+        return ((min_year is None or year >= min_year)
+                and (max_year is None or year <= max_year))
+    return keep
+
+
+def save_snapshot(directory, compact=False):
+    """
+    Write the loaded data to the directory's snapshot file, so later
+    calls to load_data can skip parsing the CSV files.
+    """
+    snapshot.save(snapshot.snapshot_path(directory, compact), {
+        "names": names,
+        "people": people,
+        "movies": movies,
+        "graph": graph
+    })
+
+
+def load_landmarks(directory, k=8, filtered=False):
+    """
+    Load the directory's stored landmark table, building and storing
+    it first if it is missing or stale. Requires a compact graph.
+
+    The stored table is for the whole dataset, so if `filtered` is True
+    a table for the loaded graph is built in memory and not stored.
+    """
+    global landmarks
+    if filtered:
+        landmarks = Landmarks.build(graph, k)
+        return
+    landmarks = Landmarks.load(directory, k)
+    if landmarks is None:
+        landmarks = Landmarks.build(graph, k)
+        landmarks.save(directory)
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two actors.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", choices=sorted(SEARCHES), default="bfs",
+                        help="search algorithm used to find the path")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the graph in integer-indexed CSR arrays")
+    parser.add_argument("--build-snapshot", action="store_true",
+                        help="parse the CSV files, write a snapshot and exit")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="always parse the CSV files")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated name pairs from FILE "
+                             "('-' for stdin) as JSON lines, by "
+                             "breadth-first search whatever --search is")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="keep up to this many paths in an LRU cache")
+    parser.add_argument("--cache-file", metavar="FILE",
+                        help="also keep cached paths in a sqlite file")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="suggest close matches for unknown names")
+    parser.add_argument("--landmarks", type=int, default=8,
+                        help="number of landmarks for --search alt")
+    parser.add_argument("--min-year", type=int,
+                        help="only load movies from this year on")
+    parser.add_argument("--max-year", type=int,
+                        help="only load movies up to this year")
+    parser.add_argument("--progress", action="store_true",
+                        help="report rows/sec, bytes and memory while loading")
+    args = parser.parse_args()
+
+    # Landmark search runs over the compact graph only
+    if args.search == "alt":
+        args.compact = True
+
+    # Keep stdout clean for JSON lines in batch mode
+    log = sys.stderr if args.batch else sys.stdout
+
+    movie_filter = None
+    if args.min_year is not None or args.max_year is not None:
+        if args.build_snapshot:
+            sys.exit("Snapshots hold the whole dataset; drop the year filter.")
+        movie_filter = year_filter(args.min_year, args.max_year)
+
+    progress = None
+    if args.progress:
+        def progress(stats):
+            loader.print_progress(stats, file=log)
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    load_data(args.directory, compact=args.compact,
+              use_snapshot=not (args.no_snapshot or args.build_snapshot),
+              movie_filter=movie_filter, progress=progress)
+    print("Data loaded.", file=log)
+
+    if args.build_snapshot:
+        save_snapshot(args.directory, compact=args.compact)
+        print("Snapshot written.")
+        return
+
+    if args.fuzzy:
+        global name_index
+        name_index = NameIndex(names)
+
+    # Batches are answered from breadth-first trees, not by --search
+    if args.search == "alt" and not args.batch:
+        print("Loading landmarks...", file=log)
+        load_landmarks(args.directory, args.landmarks,
+                       filtered=movie_filter is not None)
+
+    cache = None
+    if args.cache_size or args.cache_file:
+        # Paths depend on the year filter as well as the dataset
+        version = snapshot.dataset_version(args.directory)
+        if movie_filter is not None:
+            version += f":{args.min_year}:{args.max_year}"
+        cache = PathCache(maxsize=args.cache_size or 1024,
+                          filename=args.cache_file, version=version)
+
+    try:
+        if args.batch:
+            if args.batch == "-":
+                count, elapsed = run_batch(sys.stdin, sys.stdout, cache)
+            else:
+                with open(args.batch, encoding="utf-8") as f:
+                    count, elapsed = run_batch(f, sys.stdout, cache)
+            rate = count / elapsed if elapsed else float("inf")
+            print(f"{count} queries in {elapsed:.3f}s "
+                  f"({rate:.1f} queries/sec)", file=sys.stderr)
+        else:
+            answer_query(SEARCHES[args.search], cache)
+    finally:
+        if cache is not None:
+            print(f"Cache: {cache.stats()}", file=log)
+            cache.close()
+
 
+def answer_query(search, cache=None):
+    """
+    Prompts for two names and prints the path between them.
+    """
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
@@ -69,7 +264,10 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if cache is None:
+        path = search(source, target)
+    else:
+        path = cache.shortest_path(source, target, search)
 
     if path is None:
         print("Not connected.")
@@ -84,15 +282,126 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def run_batch(lines, output, cache=None):
+    """
+    Answers one query per line of `lines`, each holding a source and a
+    target name separated by a tab, and writes one JSON object per
+    query to `output`.
+
+    Queries are grouped by the person their source names, so names
+    differing only in case share a group, and every source's targets
+    are answered from a single breadth-first tree, skipping targets
+    found in `cache`. Returns the number of queries answered and the
+    time spent answering them.
+    """
+    start = time.perf_counter()
+
+    # Group queries by source person, keeping the original line numbers
+    queries = {}
+    count = 0
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        count += 1
+        fields = line.split("\t")
+        if len(fields) != 2:
+            _write_result(output, number, line, None, None,
+                          error="Expected two tab-separated names.")
+            continue
+        source_name, target_name = fields
+        source, error = _resolve_name(source_name)
+        if source is None:
+            _write_result(output, number, source_name, target_name, None,
+                          error=error)
+            continue
+        queries.setdefault(source, []).append(
+            (number, source_name, target_name))
+
+    for source, targets in queries.items():
+        resolved = []
+        for number, source_name, target_name in targets:
+            target, error = _resolve_name(target_name)
+            if target is None:
+                _write_result(output, number, source_name, target_name, None,
+                              error=error)
+                continue
+            path = MISSING if cache is None else cache.get(source, target)
+            if path is MISSING:
+                resolved.append((number, source_name, target_name, target))
+            else:
+                _write_result(output, number, source_name, target_name, path)
+
+        paths = shortest_path_tree(
+            source, {target for _, _, _, target in resolved})
+        for number, source_name, target_name, target in resolved:
+            path = paths.get(target)
+            if cache is not None:
+                cache.put(source, target, path)
+            _write_result(output, number, source_name, target_name, path)
+
+    return count, time.perf_counter() - start
+
+
+def _resolve_name(name):
+    """
+    Returns (person_id, None) for a name matching exactly one person,
+    or (None, error message) otherwise.
+    """
+    person_ids = names.get(name.lower(), set())
+    if len(person_ids) == 0:
+        return None, "Person not found."
+    if len(person_ids) > 1:
+        return None, f"Ambiguous name: {', '.join(sorted(person_ids))}."
+    return next(iter(person_ids)), None
+
+
+def _write_result(output, line, source, target, path, error=None):
+    """
+    Writes one batch result as a JSON line.
+    """
+    result = {"line": line, "source": source, "target": target}
+    if error is not None:
+        result["error"] = error
+    elif path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [list(step) for step in path]
+    output.write(json.dumps(result) + "\n")
+
+
+def _search(search, source, target, stats):
+    """
+    Runs `search` over the loaded representation and returns its path
+    as (movie_id, person_id) pairs.
+    """
+    if graph is None:
+        return search(source, target, neighbors_for_person, stats)
+    path = search(graph.person_index[source], graph.person_index[target],
+                  graph.neighbors, stats)
+    return graph.decode_path(path)
+
+
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    If `stats` is a dict, the number of expanded people is
+    accumulated under stats["expanded"].
     """
+    return _search(_breadth_first_search, source, target, stats)
+
 
-    # TODO
+def _breadth_first_search(source, target, neighbors, stats):
+    """
+    Breadth-first search from source to target, where `neighbors`
+    returns the (action, state) pairs adjacent to a state.
+    """
 
     # if path == 0, return empty list
     if source == target:
@@ -114,12 +423,12 @@ def shortest_path(source, target):
         # This node is being explored
         node = frontier.remove()
         explored.add(node.state)
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
 
-        neighbors = neighbors_for_person(node.state)
-        
         # Check neighbours of the node
         # if neighbour is not the target and neighbour is not yet explored, add children to the frontier (to be explored)
-        for movie, actor in neighbors:
+        for movie, actor in neighbors(node.state):
             if actor == target:
                 solution = []
                 new_node = Node(state=actor, parent=node, action=movie)
@@ -136,6 +445,219 @@ def shortest_path(source, target):
                 frontier.add(new_node)
                 
 
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one breadth-first
+    frontier from each end until they meet.
+
+    If no possible path, returns None.
+
+    If `stats` is a dict, the number of expanded people is
+    accumulated under stats["expanded"].
+    """
+    return _search(_bidirectional_search, source, target, stats)
+
+
+def _bidirectional_search(source, target, neighbors, stats):
+    """
+    Bidirectional breadth-first search from source to target, where
+    `neighbors` returns the (action, state) pairs adjacent to a state.
+    """
+    if source == target:
+        return []
+
+    # Each side maps a person to (movie_id, person_id) of the step
+    # towards its own root, and to its distance from that root
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Always grow the smaller frontier by one full level
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, parents, depth = forward_frontier, forward, forward_depth
+            other, other_depth = backward, backward_depth
+        else:
+            frontier, parents, depth = backward_frontier, backward, backward_depth
+            other, other_depth = forward, forward_depth
+
+        # Finish the whole level so the shortest meeting point wins
+        best = None
+        next_frontier = []
+        for person in frontier:
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            for movie, actor in neighbors(person):
+                if actor in other:
+                    length = depth[person] + 1 + other_depth[actor]
+                    if best is None or length < best[0]:
+                        best = (length, person, movie, actor)
+                if actor not in parents:
+                    parents[actor] = (movie, person)
+                    depth[actor] = depth[person] + 1
+                    next_frontier.append(actor)
+
+        if best is not None:
+            _, person, movie, actor = best
+            if expand_forward:
+                return _join_paths(forward, backward, person, movie, actor)
+            return _join_paths(forward, backward, actor, movie, person)
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def _join_paths(forward, backward, left, movie, right):
+    """
+    Joins the forward path ending at `left` with the backward path
+    starting at `right`, where `left` and `right` starred in `movie`.
+    """
+    path = []
+    person = left
+    while forward[person] is not None:
+        step_movie, previous = forward[person]
+        path.append((step_movie, person))
+        person = previous
+    path.reverse()
+
+    path.append((movie, right))
+    person = right
+    while backward[person] is not None:
+        step_movie, following = backward[person]
+        path.append((step_movie, following))
+        person = following
+    return path
+
+
+def shortest_path_tree(source, targets, stats=None):
+    """
+    Returns a dict mapping each target connected to the source to the
+    shortest list of (movie_id, person_id) pairs between them.
+
+    A single breadth-first tree is grown from the source until every
+    target has been reached, so all targets share the same search.
+    """
+    if graph is None:
+        return _breadth_first_tree(source, set(targets), neighbors_for_person,
+                                   stats)
+    paths = _breadth_first_tree(
+        graph.person_index[source],
+        {graph.person_index[target] for target in targets},
+        graph.neighbors, stats
+    )
+    return {graph.person_ids[target]: graph.decode_path(path)
+            for target, path in paths.items()}
+
+
+def _breadth_first_tree(source, targets, neighbors, stats):
+    """
+    Breadth-first search from source that stops once every target has
+    been reached, returning the path to each target reached.
+    """
+    # Maps each discovered state to (action, parent state)
+    parents = {source: None}
+    remaining = set(targets) - {source}
+    frontier = QueueFrontier()
+    frontier.add(Node(state=source, parent=None, action=None))
+
+    while remaining and not frontier.empty():
+        node = frontier.remove()
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
+        for action, state in neighbors(node.state):
+            if state not in parents:
+                parents[state] = (action, node.state)
+                remaining.discard(state)
+                frontier.add(Node(state=state, parent=node, action=action))
+
+    paths = {}
+    for target in targets:
+        if target not in parents:
+            continue
+        path = []
+        state = target
+        while parents[state] is not None:
+            action, parent = parents[state]
+            path.append((action, state))
+            state = parent
+        path.reverse()
+        paths[target] = path
+    return paths
+
+
+def landmark_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* search guided by
+    landmark distance bounds. Requires a compact graph and a loaded
+    landmark table (see load_landmarks).
+
+    If no possible path, returns None.
+
+    If `stats` is a dict, the number of expanded people is
+    accumulated under stats["expanded"].
+    """
+    if graph is None or landmarks is None:
+        raise ValueError("landmark search needs a compact graph and landmarks")
+    return _search(_landmark_search, source, target, stats)
+
+
+def _landmark_search(source, target, neighbors, stats):
+    """
+    A* search from source to target over person indices, where
+    `neighbors` returns the (action, state) pairs adjacent to a state.
+    """
+    lower_bound = landmarks.targeting(target)
+    if lower_bound(source) is None:
+        return None
+
+    # Maps each discovered state to (action, parent state)
+    parents = {source: None}
+    cost = {source: 0}
+    explored = set()
+
+    # Ties go to the deeper state, which is closer to the target
+    heap = [(lower_bound(source), 0, source)]
+    while heap:
+        state = heapq.heappop(heap)[2]
+        if state in explored:
+            continue
+        if state == target:
+            path = []
+            while parents[state] is not None:
+                action, parent = parents[state]
+                path.append((action, state))
+                state = parent
+            path.reverse()
+            return path
+
+        explored.add(state)
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
+
+        step = cost[state] + 1
+        for action, neighbor in neighbors(state):
+            if step < cost.get(neighbor, step + 1):
+                bound = lower_bound(neighbor)
+                if bound is None:
+                    continue
+                cost[neighbor] = step
+                parents[neighbor] = (action, state)
+                heapq.heappush(heap, (step + bound, -step, neighbor))
+
+    return None
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -143,7 +665,9 @@ def person_id_for_name(name):
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
-        return None
+        if name_index is None:
+            return None
+        return person_id_for_suggestion(name)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -162,11 +686,34 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_id_for_suggestion(name):
+    """
+    Offers the indexed names closest to an unknown name and returns
+    the IMDB id for the one chosen, if any.
+    """
+    suggestions = [key for key, _ in name_index.search(name)]
+    if not suggestions:
+        return None
+    print(f"No exact match for '{name}'. Did you mean:")
+    for i, key in enumerate(suggestions, 1):
+        person = people[next(iter(names[key]))]
+        print(f"{i}: {person['name']}")
+    try:
+        choice = int(input("Number: "))
+        if 1 <= choice <= len(suggestions):
+            return person_id_for_name(suggestions[choice - 1])
+    except ValueError:
+        pass
+    return None
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -175,5 +722,13 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+# Search algorithms selectable from the command line
+SEARCHES = {
+    "bfs": shortest_path,
+    "bidirectional": bidirectional_shortest_path,
+    "alt": landmark_shortest_path,
+}
+
+
 if __name__ == "__main__":
     main()
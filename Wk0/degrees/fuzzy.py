@@ -0,0 +1,194 @@
+from array import array
+from bisect import bisect_left
+
+
+class NameIndex():
+    """
+    Index over lowercased names supporting prefix lookups and
+    typo-tolerant lookups ranked by edit distance.
+
+    Names are split into words. Every word of the vocabulary is stored
+    under itself and under each string obtained by deleting one of its
+    characters, so the words within one edit of a query word are found
+    by looking up the query word's own deletions. The names containing
+    a close match for every query word are then ranked by their edit
+    distance to the whole query.
+
+    Postings number the names by length, so the names too long or too
+    short to be within max_edits of a query are skipped by bisecting
+    each posting rather than by checking every name in it.
+    """
+
+    def __init__(self, names, max_edits=2):
+        self.max_edits = max_edits
+        self.keys = sorted(names)
+
+        # The names by length, then alphabetically, and the position of
+        # the first name of each length or longer
+        self.by_length = sorted(self.keys, key=len)
+        longest = len(self.by_length[-1]) if self.by_length else 0
+        self.length_starts = array("i", [len(self.by_length)] * (longest + 2))
+        for i in range(len(self.by_length) - 1, -1, -1):
+            self.length_starts[len(self.by_length[i])] = i
+        for length in range(longest, -1, -1):
+            self.length_starts[length] = min(self.length_starts[length],
+                                             self.length_starts[length + 1])
+
+        # Maps each word to the by_length indices of the names containing it
+        self.words = {}
+        for i, key in enumerate(self.by_length):
+            for word in set(key.split()):
+                posting = self.words.get(word)
+                if posting is None:
+                    posting = self.words[word] = array("i")
+                posting.append(i)
+
+        # Maps each word and one-character deletion to the words it
+        # came from; a lone word is stored unwrapped to save memory
+        self.deletes = {}
+        for word in self.words:
+            for variant in deletions(word):
+                entry = self.deletes.get(variant)
+                if entry is None:
+                    self.deletes[variant] = word
+                elif isinstance(entry, str):
+                    self.deletes[variant] = [entry, word]
+                else:
+                    entry.append(word)
+
+    def prefix(self, query, limit=10):
+        """
+        Returns up to `limit` names starting with `query`, in order.
+        """
+        query = query.lower()
+        matches = []
+        i = bisect_left(self.keys, query)
+        while (i < len(self.keys) and len(matches) < limit
+               and self.keys[i].startswith(query)):
+            matches.append(self.keys[i])
+            i += 1
+        return matches
+
+    def similar_words(self, word):
+        """
+        Returns the indexed words within one edit of `word`.
+        """
+        similar = set()
+        for variant in deletions(word):
+            entry = self.deletes.get(variant)
+            if entry is None:
+                continue
+            for candidate in ([entry] if isinstance(entry, str) else entry):
+                if within_one_edit(word, candidate):
+                    similar.add(candidate)
+        return similar
+
+    def search(self, query, limit=5):
+        """
+        Returns up to `limit` (name, distance) pairs for names within
+        max_edits edits of `query` or starting with it, closest first.
+        Prefix matches that are further away rank after typo matches.
+        """
+        query = query.lower()
+        ranked = {}
+
+        # Only names of a length within max_edits of the query's can be
+        # within max_edits of it; they are one run of by_length indices
+        starts = self.length_starts
+        lo = starts[min(max(len(query) - self.max_edits, 0), len(starts) - 1)]
+        hi = starts[min(len(query) + self.max_edits + 1, len(starts) - 1)]
+
+        # Names with a close match for every word of the query, starting
+        # from the word whose matches are in the fewest names. Postings
+        # are sorted, so later words only look up the candidates left
+        # instead of walking postings of common words
+        matches = []
+        for word in set(query.split()):
+            postings = []
+            for similar in self.similar_words(word):
+                posting = self.words[similar]
+                postings.append((posting, bisect_left(posting, lo),
+                                 bisect_left(posting, hi)))
+            matches.append((sum(end - start for _, start, end in postings),
+                            postings))
+        matches.sort(key=lambda match: match[0])
+
+        candidates = None
+        for _, postings in matches:
+            if candidates is None:
+                candidates = set()
+                for posting, start, end in postings:
+                    candidates.update(posting[start:end])
+            else:
+                candidates = {i for i in candidates
+                              if any(contains(posting, i)
+                                     for posting, _, _ in postings)}
+            if not candidates:
+                break
+
+        for i in candidates or ():
+            key = self.by_length[i]
+            distance = edit_distance(query, key, self.max_edits)
+            if distance is not None:
+                ranked[key] = distance
+
+        # Completions of the query as typed
+        for key in self.prefix(query, limit):
+            if key not in ranked:
+                ranked[key] = self.max_edits + len(key) - len(query)
+
+        return sorted(ranked.items(), key=lambda item: (item[1], item[0]))[
+            :limit]
+
+
+def contains(posting, i):
+    """
+    Returns True if the sorted array `posting` holds `i`.
+    """
+    j = bisect_left(posting, i)
+    return j < len(posting) and posting[j] == i
+
+
+def deletions(word):
+    """
+    Returns the word and every string made by deleting one character.
+    """
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def within_one_edit(a, b):
+    """
+    Returns True if a and b are at most one edit apart, comparing the
+    strings around their first difference instead of running the full
+    edit distance.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def edit_distance(a, b, limit):
+    """
+    Returns the Levenshtein distance between a and b, or None if it
+    exceeds `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= limit else None
@@ -0,0 +1,123 @@
+"""
+Landmark distance tables for A* search over a CompactGraph (ALT).
+
+For a landmark l and people v and t, the triangle inequality gives
+|d(l, t) - d(l, v)| <= d(v, t), so the largest such difference over
+all landmarks is an admissible, consistent A* heuristic.
+"""
+import os
+from array import array
+
+import snapshot
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class Landmarks():
+
+    def __init__(self, people, distances):
+        self.people = people
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k=8):
+        """
+        Picks the k people with the most movies as landmarks and
+        computes every person's distance from each of them.
+        """
+        degree = [graph.person_offsets[p + 1] - graph.person_offsets[p]
+                  for p in range(len(graph.person_ids))]
+        people = sorted(range(len(degree)), key=lambda p: -degree[p])[:k]
+        return cls(people, [distances_from(graph, p) for p in people])
+
+    def targeting(self, target):
+        """
+        Returns a function giving a lower bound on the distance from a
+        person to `target`, or None if they cannot be connected.
+        """
+        pairs = [(d, d[target]) for d in self.distances]
+
+        def lower_bound(person):
+            bound = 0
+            for d, to_target in pairs:
+                from_person = d[person]
+                if (from_person == UNREACHABLE) != (to_target == UNREACHABLE):
+                    return None
+                if from_person != UNREACHABLE:
+                    difference = abs(to_target - from_person)
+                    if difference > bound:
+                        bound = difference
+            return bound
+
+        return lower_bound
+
+    def save(self, directory):
+        """
+        Stores the table next to the dataset it was built from.
+        """
+        snapshot.save(landmarks_path(directory), {
+            "version": snapshot.dataset_version(directory),
+            "people": self.people,
+            "distances": [d.tobytes() for d in self.distances]
+        })
+
+    @classmethod
+    def load(cls, directory, k=None):
+        """
+        Returns the stored table for a directory, or None if there is
+        none, it is stale, or it holds a different number of landmarks.
+        """
+        path = landmarks_path(directory)
+        if not os.path.exists(path):
+            return None
+        data = snapshot.load(path)
+        if (data is None
+                or data["version"] != snapshot.dataset_version(directory)
+                or (k is not None and len(data["people"]) != k)):
+            return None
+        return cls(data["people"],
+                   [array("B", distances) for distances in data["distances"]])
+
+
+def landmarks_path(directory):
+    """
+    Returns the file a directory's landmark table is stored in.
+    """
+    return os.path.join(directory,
+                        f".degrees-landmarks-v{snapshot.VERSION}.snapshot")
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of every person's co-star distance from `source`,
+    capped below UNREACHABLE.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_stars = graph.movie_stars
+
+    distances = array("B", [UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[source] = 0
+    frontier = [source]
+    depth = 0
+    while frontier and depth < UNREACHABLE - 1:
+        depth += 1
+        next_frontier = []
+        for person in frontier:
+            start = person_offsets[person]
+            end = person_offsets[person + 1]
+            for movie in person_movies[start:end]:
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                first = movie_offsets[movie]
+                last = movie_offsets[movie + 1]
+                for star in movie_stars[first:last]:
+                    if distances[star] == UNREACHABLE:
+                        distances[star] = depth
+                        next_frontier.append(star)
+        frontier = next_frontier
+    return distances
@@ -0,0 +1,99 @@
+"""
+Streaming readers for the degrees CSV files.
+
+Rows are yielded one at a time through generators, so callers can
+filter them before anything is kept in memory. A progress hook, if
+given, is called with a stats dict every `every` rows and once more
+when a file is finished:
+
+    {"file": path, "rows": rows read, "bytes": bytes read,
+     "elapsed": seconds, "rows_per_sec": rate,
+     "peak_memory": peak bytes (or None), "done": bool}
+"""
+import csv
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def read_rows(path, progress=None, every=100000):
+    """
+    Yields each row of a CSV file as a dict, reporting to `progress`.
+    """
+    stats = {"file": path, "rows": 0, "bytes": 0, "elapsed": 0.0,
+             "rows_per_sec": 0.0, "peak_memory": None, "done": False}
+    start = time.perf_counter()
+
+    with open(path, encoding="utf-8", newline="") as f:
+
+        def report(done=False):
+            # Bytes consumed from the file so far, including read-ahead
+            stats["bytes"] = f.buffer.tell()
+            stats["elapsed"] = time.perf_counter() - start
+            stats["rows_per_sec"] = (stats["rows"] / stats["elapsed"]
+                                     if stats["elapsed"] else 0.0)
+            stats["peak_memory"] = peak_memory()
+            stats["done"] = done
+            progress(dict(stats))
+
+        for row in csv.DictReader(f):
+            stats["rows"] += 1
+            if progress is not None and stats["rows"] % every == 0:
+                report()
+            yield row
+        if progress is not None:
+            report(done=True)
+
+
+def people_rows(directory, progress=None):
+    """
+    Yields the rows of a directory's people.csv.
+    """
+    return read_rows(os.path.join(directory, "people.csv"), progress)
+
+
+def movie_rows(directory, progress=None):
+    """
+    Yields the rows of a directory's movies.csv.
+    """
+    return read_rows(os.path.join(directory, "movies.csv"), progress)
+
+
+def star_rows(directory, progress=None):
+    """
+    Yields the rows of a directory's stars.csv.
+    """
+    return read_rows(os.path.join(directory, "stars.csv"), progress)
+
+
+def peak_memory():
+    """
+    Returns the peak memory in bytes: traced memory while tracemalloc
+    is running, else the process's peak resident set size, or None
+    where neither is available.
+    """
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[1]
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def print_progress(stats, file=sys.stdout):
+    """
+    Progress hook printing one line per report.
+    """
+    peak = stats["peak_memory"]
+    peak = "?" if peak is None else f"{peak / 2 ** 20:.1f} MiB"
+    state = "done" if stats["done"] else "reading"
+    print(f"  {os.path.basename(stats['file'])}: {state}, "
+          f"{stats['rows']} rows, {stats['bytes'] / 2 ** 20:.1f} MiB, "
+          f"{stats['rows_per_sec']:.0f} rows/sec, peak {peak}", file=file)
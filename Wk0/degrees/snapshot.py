@@ -0,0 +1,142 @@
+"""
+Versioned binary snapshots of a loaded degrees dataset.
+
+A snapshot file is laid out as:
+
+    MAGIC | version (u32) | pickle length (u64) | pickle stream
+          | buffer count (u32) | (buffer length (u64) | buffer bytes)*
+
+The pickle stream is written with protocol 5, so large arrays that
+expose a PickleBuffer (such as those of a CompactGraph) are stored
+out-of-band as raw bytes after it instead of being copied into it.
+Loading maps the file into memory rather than reading it, so those
+buffers reach pickle as views of the mapped file and each is copied
+once, when the object owning it is rebuilt (see compact._from_buffers).
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+
+MAGIC = b"DEGREES\0"
+VERSION = 1
+
+# Files a snapshot must be newer than to be reused
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+_HEADER = struct.Struct("<IQ")
+_COUNT = struct.Struct("<I")
+_LENGTH = struct.Struct("<Q")
+
+
+def snapshot_path(directory, compact=False):
+    """
+    Returns the snapshot file used for a directory and representation.
+    """
+    kind = "compact" if compact else "dict"
+    return os.path.join(directory, f".degrees-{kind}-v{VERSION}.snapshot")
+
+
+def is_fresh(directory, compact=False):
+    """
+    Returns True if the directory's snapshot exists and is newer than
+    all of its CSV files.
+    """
+    try:
+        built = os.path.getmtime(snapshot_path(directory, compact))
+    except OSError:
+        return False
+    return all(
+        os.path.getmtime(os.path.join(directory, filename)) <= built
+        for filename in CSV_FILES
+    )
+
+
+def dataset_version(directory):
+    """
+    Returns a fingerprint of the directory's CSV files that changes
+    whenever any of them is modified or replaced.
+    """
+    digest = hashlib.sha1(str(VERSION).encode())
+    for filename in CSV_FILES:
+        stat = os.stat(os.path.join(directory, filename))
+        digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def save(path, data):
+    """
+    Writes `data` to a snapshot file at `path`, replacing it atomically.
+    """
+    buffers = []
+    payload = pickle.dumps(data, protocol=5, buffer_callback=buffers.append)
+
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(VERSION, len(payload)))
+        f.write(payload)
+        f.write(_COUNT.pack(len(buffers)))
+        for buffer in buffers:
+            raw = buffer.raw()
+            f.write(_LENGTH.pack(raw.nbytes))
+            f.write(raw)
+    os.replace(temporary, path)
+
+
+def load(path):
+    """
+    Returns the data stored in a snapshot file, or None if the file is
+    missing, was written by a different snapshot version, or is
+    truncated or corrupt.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # ValueError: an empty file cannot be mapped
+        return None
+    try:
+        return _parse(memoryview(mapped))
+    except (struct.error, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+
+
+def _parse(view):
+    """
+    Returns the data in a snapshot file's contents, or None if they are
+    from a different snapshot version. Raises ValueError or one of the
+    errors of struct and pickle if they are truncated or corrupt.
+    """
+    if view[:len(MAGIC)] != MAGIC:
+        return None
+    offset = len(MAGIC)
+    version, length = _HEADER.unpack_from(view, offset)
+    if version != VERSION:
+        return None
+    offset += _HEADER.size
+    payload = _take(view, offset, length)
+    offset += length
+
+    # Out-of-band buffers are views of the mapped file; pickle hands
+    # them to the functions rebuilding their objects, which copy them
+    count, = _COUNT.unpack_from(view, offset)
+    offset += _COUNT.size
+    buffers = []
+    for _ in range(count):
+        size, = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        buffers.append(_take(view, offset, size))
+        offset += size
+    return pickle.loads(payload, buffers=buffers)
+
+
+def _take(view, offset, size):
+    """
+    Returns `size` bytes of `view` from `offset`, or raises ValueError
+    if the view ends first.
+    """
+    if offset + size > len(view):
+        raise ValueError("truncated snapshot")
+    return view[offset:offset + size]
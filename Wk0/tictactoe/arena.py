@@ -0,0 +1,220 @@
+"""
+Headless self-play arena for the tictactoe engines.
+
+Plays every ordered pairing of the chosen engines across a process
+pool, each game from an optional random opening, and reports win, draw
+and loss counts with nodes searched and time per move. Results can be
+appended to a CSV file and written to a JSON report, so search speed
+can be compared between runs.
+
+Usage: python arena.py [--games N] [--engines NAME ...] [--csv FILE]
+"""
+import argparse
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+# Engine used for the "mnk" configuration, and its budget per move
+MNK_GAME = mnk.Game(3, 3, 3)
+MNK_TIME_LIMIT = 1.0
+
+
+def bitboard_search(board):
+    """
+    Returns the bitboard engine's move found by search alone, without
+    the solved-position table.
+    """
+    x, o = bitboard.from_board(board)
+    return bitboard.CELLS[bitboard.value(x, o, -2, 2)[1]]
+
+
+def mnk_search(board):
+    """
+    Returns the m,n,k engine's move on the 3x3 board.
+    """
+    return MNK_GAME.best_move(board, time_limit=MNK_TIME_LIMIT)
+
+
+ENGINES = {
+    "alpha-beta": ttt.alpha_beta,
+    "memoized": ttt.memoized_minimax,
+    "bitboard": bitboard_search,
+    "solved": ttt.minimax,
+    "mnk": mnk_search
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Self-play arena for the tictactoe engines.")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES,
+                        default=list(ENGINES), metavar="NAME",
+                        help=f"engines to pair up ({', '.join(ENGINES)})")
+    parser.add_argument("--games", type=int, default=10,
+                        help="games per ordered pairing")
+    parser.add_argument("--openings", type=int, default=1,
+                        help="random plies played before the engines")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the random openings")
+    parser.add_argument("--warm", action="store_true",
+                        help="keep transposition tables between games")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--csv", metavar="FILE",
+                        help="append per-engine results to a CSV file")
+    parser.add_argument("--json", metavar="FILE",
+                        help="write a JSON report with every game")
+    args = parser.parse_args()
+
+    matches = [
+        (x, o, args.seed * 1000003 + index, args.openings, args.warm)
+        for x in args.engines for o in args.engines
+        for index in range(args.games)
+    ]
+    start = time.perf_counter()
+    games = play_matches(matches, args.workers)
+    elapsed = time.perf_counter() - start
+    summary = summarize(games)
+
+    print(f"Played {len(games)} games in {elapsed:.2f}s "
+          f"with {args.workers} workers")
+    print(f"  {'engine':>10} {'W':>5} {'D':>5} {'L':>5} {'moves':>6} "
+          f"{'nodes/move':>11} {'ms/move':>9} {'slowest ms':>11}")
+    for name, row in summary.items():
+        print(f"  {name:>10} {row['wins']:>5} {row['draws']:>5} "
+              f"{row['losses']:>5} {row['moves']:>6} "
+              f"{row['nodes_per_move']:>11.1f} "
+              f"{row['seconds_per_move'] * 1e3:>9.3f} "
+              f"{row['slowest_move'] * 1e3:>11.3f}")
+
+    timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+    if args.csv:
+        write_csv(args.csv, summary, timestamp, vars(args))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": timestamp,
+                       "config": {key: vars(args)[key] for key in
+                                  ("engines", "games", "openings", "seed",
+                                   "warm", "workers")},
+                       "elapsed": elapsed,
+                       "engines": summary,
+                       "games": games}, f, indent=2)
+
+
+def play_matches(matches, workers):
+    """
+    Plays each (x engine, o engine, seed, openings, warm) match and
+    returns the games in match order.
+    """
+    if workers <= 1:
+        return [play_game(*match) for match in matches]
+    with multiprocessing.Pool(workers) as pool:
+        return pool.starmap(play_game, matches, chunksize=4)
+
+
+def play_game(x_engine, o_engine, seed, openings, warm=False):
+    """
+    Plays one game after `openings` random plies chosen from `seed`.
+
+    Returns a dict with the engines, the opening moves, the winner
+    ("X", "O" or None) and a (player, nodes, seconds) entry for every
+    engine move.
+    """
+    if not warm:
+        ttt.transposition_table.clear()
+        bitboard.transposition_table.clear()
+        MNK_GAME.transposition_table.clear()
+        MNK_GAME.history.clear()
+
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    opening = []
+    for _ in range(openings):
+        if ttt.terminal(board):
+            break
+        action = rng.choice(sorted(ttt.actions(board)))
+        opening.append(action)
+        board = ttt.result(board, action)
+
+    engines = {ttt.X: ENGINES[x_engine], ttt.O: ENGINES[o_engine]}
+    moves = []
+    while not ttt.terminal(board):
+        turn = ttt.player(board)
+        ttt.nodes_searched = bitboard.nodes_searched = 0
+        start = time.perf_counter()
+        action = engines[turn](board)
+        elapsed = time.perf_counter() - start
+        nodes = ttt.nodes_searched + bitboard.nodes_searched
+        if engines[turn] is mnk_search:
+            nodes += MNK_GAME.nodes_searched
+        moves.append((turn, nodes, elapsed))
+        board = ttt.result(board, action)
+
+    return {"x": x_engine, "o": o_engine, "seed": seed,
+            "opening": opening, "winner": ttt.winner(board), "moves": moves}
+
+
+def summarize(games):
+    """
+    Returns a dict mapping each engine to its wins, draws, losses,
+    moves, nodes and timings over `games`.
+    """
+    summary = {}
+    for game in games:
+        for mark, name in ((ttt.X, game["x"]), (ttt.O, game["o"])):
+            row = summary.setdefault(name, {
+                "games": 0, "wins": 0, "draws": 0, "losses": 0,
+                "moves": 0, "nodes": 0, "seconds": 0.0, "slowest_move": 0.0
+            })
+            row["games"] += 1
+            if game["winner"] is None:
+                row["draws"] += 1
+            elif game["winner"] == mark:
+                row["wins"] += 1
+            else:
+                row["losses"] += 1
+            for turn, nodes, seconds in game["moves"]:
+                if turn == mark:
+                    row["moves"] += 1
+                    row["nodes"] += nodes
+                    row["seconds"] += seconds
+                    row["slowest_move"] = max(row["slowest_move"], seconds)
+
+    for row in summary.values():
+        moves = row["moves"] or 1
+        row["nodes_per_move"] = row["nodes"] / moves
+        row["seconds_per_move"] = row["seconds"] / moves
+        row["nodes_per_sec"] = (row["nodes"] / row["seconds"]
+                                if row["seconds"] else 0.0)
+    return summary
+
+
+def write_csv(path, summary, timestamp, config):
+    """
+    Appends one row per engine to a CSV file, writing the header when
+    the file is new.
+    """
+    fields = ["timestamp", "engine", "games", "wins", "draws", "losses",
+              "moves", "nodes", "nodes_per_move", "seconds_per_move",
+              "slowest_move", "nodes_per_sec", "openings", "seed", "warm"]
+    new = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fields, extrasaction="ignore")
+        if new:
+            writer.writeheader()
+        for name, row in summary.items():
+            writer.writerow(dict(row, timestamp=timestamp, engine=name,
+                                 openings=config["openings"],
+                                 seed=config["seed"], warm=config["warm"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares nodes searched and per-move latency of the tictactoe engines.
+
+Usage: python benchmark.py
+"""
+import time
+
+import bitboard
+import tictactoe as ttt
+
+
+def play(engine):
+    """
+    Plays one game of `engine` against itself from the empty board.
+    Returns a list of (nodes searched, seconds) for every move.
+    """
+    board = ttt.initial_state()
+    moves = []
+    while not ttt.terminal(board):
+        ttt.nodes_searched = bitboard.nodes_searched = 0
+        start = time.perf_counter()
+        action = engine(board)
+        elapsed = time.perf_counter() - start
+        moves.append((ttt.nodes_searched + bitboard.nodes_searched, elapsed))
+        board = ttt.result(board, action)
+    return moves
+
+
+def report(name, moves):
+    nodes = sum(n for n, _ in moves)
+    elapsed = sum(t for _, t in moves)
+    slowest = max(t for _, t in moves)
+    print(f"  {name:>22}: {nodes:>8} nodes, "
+          f"{elapsed / len(moves) * 1e3:9.3f}ms per move, "
+          f"slowest {slowest * 1e3:9.3f}ms")
+
+
+def main():
+    print("Self-play game, per engine")
+    report("alpha-beta", play(ttt.alpha_beta))
+
+    ttt.transposition_table.clear()
+    report("memoized (cold table)", play(ttt.memoized_minimax))
+    report("memoized (warm table)", play(ttt.memoized_minimax))
+
+    # Search with the bitboard engine, bypassing the solved table
+    solved = dict(bitboard.solved)
+    bitboard.solved.clear()
+    bitboard.transposition_table.clear()
+    report("bitboard (cold table)", play(ttt.minimax))
+    report("bitboard (warm table)", play(ttt.minimax))
+
+    # The bitboard engine on its own, without list-board conversions
+    bitboard.transposition_table.clear()
+    for name in ("raw bitboard (cold)", "raw bitboard (warm)"):
+        x = o = 0
+        moves = []
+        while not bitboard.terminal(x, o):
+            bitboard.nodes_searched = 0
+            start = time.perf_counter()
+            move = bitboard.minimax(x, o)
+            elapsed = time.perf_counter() - start
+            moves.append((bitboard.nodes_searched, elapsed))
+            x, o = bitboard.result(x, o, move)
+        report(name, moves)
+
+    bitboard.solved.update(solved)
+    report("solved table", play(ttt.minimax))
+    print(f"  solved table: {len(bitboard.solved)} canonical positions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Tic Tac Toe engine on bitboards.
+
+A position is a pair of 9-bit integers (x, o), where bit 3 * i + j is
+set when cell (i, j) holds that player's mark. Move generation, win
+detection and results are integer operations and table lookups.
+
+Positions equal under the board's 8 rotations and reflections share
+one canonical key, which the search and the solved-position table
+are indexed by. Run this module to rebuild the solved-position file.
+"""
+import os
+import struct
+
+X = "X"
+O = "O"
+
+FULL = 0b111_111_111
+
+# Index of the bit for each cell, and the cell for each bit
+CELLS = tuple((i, j) for i in range(3) for j in range(3))
+
+WIN_MASKS = (
+    0b000_000_111, 0b000_111_000, 0b111_000_000,  # rows
+    0b001_001_001, 0b010_010_010, 0b100_100_100,  # columns
+    0b100_010_001, 0b001_010_100                  # diagonals
+)
+
+# Lookup tables indexed by a 9-bit mask
+COUNT = tuple(bin(mask).count("1") for mask in range(512))
+WON = tuple(any(mask & win == win for win in WIN_MASKS)
+            for mask in range(512))
+MOVES = tuple(tuple(bit for bit in range(9) if mask >> bit & 1)
+              for mask in range(512))
+
+# Cell (i, j) moves to these cells under the 8 board symmetries
+SYMMETRIES = (
+    lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j), lambda i, j: (2 - i, j),
+    lambda i, j: (j, i), lambda i, j: (2 - j, 2 - i)
+)
+
+# BIT_MAP[s][bit] is the bit a cell moves to under symmetry s, and
+# BIT_UNMAP[s] undoes it
+BIT_MAP = tuple(
+    tuple(3 * symmetry(i, j)[0] + symmetry(i, j)[1] for i, j in CELLS)
+    for symmetry in SYMMETRIES
+)
+BIT_UNMAP = tuple(
+    tuple(mapping.index(bit) for bit in range(9)) for mapping in BIT_MAP
+)
+
+
+
+def _mask_map(mapping):
+    """
+    Returns a table of every 9-bit mask with its bits moved by mapping,
+    built from the mask without its lowest bit.
+    """
+    table = [0] * 512
+    for mask in range(1, 512):
+        low = mask & -mask
+        table[mask] = table[mask ^ low] | 1 << mapping[low.bit_length() - 1]
+    return tuple(table)
+
+
+# MASK_MAP[s][mask] is a 9-bit mask transformed by symmetry s
+MASK_MAP = tuple(_mask_map(mapping) for mapping in BIT_MAP)
+
+# Bound types of transposition table values
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maps a canonical key to (value, bound type, best move in the
+# canonical orientation), shared by every search in the process
+transposition_table = {}
+
+# Maps the canonical key of every reachable non-terminal position to
+# its optimal move in the canonical orientation
+solved = {}
+
+# File the solved-position table is stored in
+SOLVED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "solved.bin")
+SOLVED_MAGIC = b"TTT\x01"
+
+# Number of positions visited by searches, for benchmarking
+nodes_searched = 0
+
+
+def from_board(board):
+    """
+    Returns the (x, o) bitboards of a list-of-lists board.
+    """
+    x = o = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == X:
+                x |= bit
+            elif cell == O:
+                o |= bit
+            bit <<= 1
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board of (x, o) bitboards.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else None for j in range(3)] for i in range(3)]
+
+
+def player(x, o):
+    """
+    Returns the player who has the next turn.
+    """
+    return X if COUNT[x] <= COUNT[o] else O
+
+
+def actions(x, o):
+    """
+    Returns the bit indices of the empty cells.
+    """
+    return MOVES[FULL & ~(x | o)]
+
+
+def result(x, o, move):
+    """
+    Returns the (x, o) position after the player to move takes the
+    cell at bit index `move`.
+    """
+    bit = 1 << move
+    if not 0 <= move < 9 or (x | o) & bit:
+        raise ValueError('This move is not allowed')
+    if COUNT[x] <= COUNT[o]:
+        return x | bit, o
+    return x, o | bit
+
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if WON[x]:
+        return X
+    if WON[o]:
+        return O
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return WON[x] or WON[o] or (x | o) == FULL
+
+
+def utility(x, o):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return 1 if WON[x] else -1 if WON[o] else 0
+
+
+def canonical(x, o):
+    """
+    Returns (key, symmetry): the smallest x | o << 9 over all
+    symmetries of the position, and the symmetry that produces it.
+    """
+    best = None
+    for s, masks in enumerate(MASK_MAP):
+        key = masks[x] | masks[o] << 9
+        if best is None or key < best:
+            best, symmetry = key, s
+    return best, symmetry
+
+
+def minimax(x, o):
+    """
+    Returns the bit index of the optimal move for the player to move,
+    or None if the game is over.
+    """
+    if terminal(x, o):
+        return None
+    key, symmetry = canonical(x, o)
+    move = solved.get(key)
+    if move is not None:
+        return BIT_UNMAP[symmetry][move]
+    return value(x, o, -2, 2)[1]
+
+
+def value(x, o, alpha, beta):
+    """
+    Returns (value, best move) of a position with alpha-beta pruning,
+    using and filling the transposition table. The value is exact
+    when it lies strictly between alpha and beta, and otherwise a
+    bound on the exact value in that direction.
+
+    Moves leading to positions symmetric to an earlier move's are
+    skipped, since they have the same value.
+    """
+    global nodes_searched
+    nodes_searched += 1
+
+    key, symmetry = canonical(x, o)
+    entry = transposition_table.get(key)
+    if entry is not None:
+        v, bound, move = entry
+        if (bound == EXACT
+                or (bound == LOWER and v >= beta)
+                or (bound == UPPER and v <= alpha)):
+            return v, None if move is None else BIT_UNMAP[symmetry][move]
+
+    if WON[x]:
+        return 1, None
+    if WON[o]:
+        return -1, None
+    occupied = x | o
+    if occupied == FULL:
+        return 0, None
+
+    original_alpha, original_beta = alpha, beta
+    maximizing = COUNT[x] <= COUNT[o]
+    v = -2 if maximizing else 2
+    move = None
+    tried = set()
+    for bit in MOVES[FULL & ~occupied]:
+        if maximizing:
+            child_x, child_o = x | 1 << bit, o
+        else:
+            child_x, child_o = x, o | 1 << bit
+        child_key = canonical(child_x, child_o)[0]
+        if child_key in tried:
+            continue
+        tried.add(child_key)
+
+        child = value(child_x, child_o, alpha, beta)[0]
+        if maximizing and child > v:
+            v, move = child, bit
+            alpha = max(alpha, v)
+        elif not maximizing and child < v:
+            v, move = child, bit
+            beta = min(beta, v)
+        if alpha >= beta:
+            break
+
+    if v <= original_alpha:
+        bound = UPPER
+    elif v >= original_beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transposition_table[key] = (v, bound, BIT_MAP[symmetry][move])
+    return v, move
+
+
+def build_solved_table():
+    """
+    Returns a dict mapping the canonical key of every reachable
+    non-terminal position to its optimal move in canonical orientation.
+    """
+    table = {}
+    frontier = [(0, 0)]
+    while frontier:
+        x, o = frontier.pop()
+        key, symmetry = canonical(x, o)
+        if key in table or terminal(x, o):
+            continue
+        move = value(x, o, -2, 2)[1]
+        table[key] = BIT_MAP[symmetry][move]
+        for bit in actions(x, o):
+            frontier.append(result(x, o, bit))
+    return table
+
+
+def save_solved_table(table, path=SOLVED_PATH):
+    """
+    Writes a solved-position table as 32-bit little-endian words of
+    key << 4 | move, sorted by key.
+    """
+    with open(path, "wb") as f:
+        f.write(SOLVED_MAGIC)
+        for key in sorted(table):
+            f.write(struct.pack("<I", key << 4 | table[key]))
+
+
+def load_solved_table(path=SOLVED_PATH):
+    """
+    Returns the solved-position table stored at `path`, or an empty
+    table if it is missing or unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return {}
+    if data[:len(SOLVED_MAGIC)] != SOLVED_MAGIC:
+        return {}
+    return {word >> 4: word & 0xF for word, in
+            struct.iter_unpack("<I", data[len(SOLVED_MAGIC):])}
+
+
+solved.update(load_solved_table())
+
+
+if __name__ == "__main__":
+    save_solved_table(build_solved_table())
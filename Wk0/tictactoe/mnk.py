@@ -0,0 +1,339 @@
+"""
+m,n,k-game player: tic-tac-toe on a rows x cols board where k marks in
+a row, column or diagonal win (Gomoku is 15,15,5).
+
+Boards use the same list-of-lists layout as tictactoe.py. The search
+is an iterative-deepening negamax alpha-beta over two bitboards, with
+a transposition table, killer and history move ordering, a line-based
+heuristic evaluation, and a wall-clock budget per move.
+"""
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; wins found sooner score higher
+WIN = 1 << 40
+
+# Bound types of transposition table values
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class _Timeout(Exception):
+    """Raised inside the search when the move budget runs out."""
+
+
+class Game():
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if not (1 <= k <= max(rows, cols)):
+            raise ValueError("win length must fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+
+        # Every k-cell line, and the lines through each cell
+        self.lines = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.lines.append(sum(
+                            1 << self.bit(i + di * step, j + dj * step)
+                            for step in range(k)))
+        self.lines_through = [
+            [line for line in self.lines if line >> cell & 1]
+            for cell in range(self.size)
+        ]
+
+        # Cells within two steps of each cell, for candidate moves
+        self.nearby = []
+        for cell in range(self.size):
+            i, j = divmod(cell, cols)
+            self.nearby.append(sum(
+                1 << self.bit(a, b)
+                for a in range(max(0, i - 2), min(rows, i + 3))
+                for b in range(max(0, j - 2), min(cols, j + 3))))
+
+        # Evaluation weight of an open line holding n marks
+        self.weights = [0] + [4 ** n for n in range(1, k + 1)]
+
+        self.transposition_table = {}
+        self.history = {}
+        self.nodes_searched = 0
+
+    def bit(self, i, j):
+        return i * self.cols + j
+
+    def cell(self, bit):
+        return divmod(bit, self.cols)
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.cols for _ in range(self.rows)]
+
+    def from_board(self, board):
+        """
+        Returns the (x, o) bitboards of a list-of-lists board.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << self.bit(i, j)
+                elif cell == O:
+                    o |= 1 << self.bit(i, j)
+        return x, o
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x, o = self.from_board(board)
+        return X if x.bit_count() <= o.bit_count() else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.rows) for j in range(self.cols)
+                if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if (not (0 <= i < self.rows and 0 <= j < self.cols)
+                or board[i][j] != EMPTY):
+            raise ValueError('This move is not allowed')
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        x, o = self.from_board(board)
+        for line in self.lines:
+            if x & line == line:
+                return X
+            if o & line == line:
+                return O
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        x, o = self.from_board(board)
+        return self.winner(board) is not None or (x | o) == self.full
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        won = self.winner(board)
+        return 1 if won == X else -1 if won == O else 0
+
+    def best_move(self, board, time_limit=1.0, max_depth=None,
+                  should_stop=None):
+        """
+        Returns the best action (i, j) found for the current player by
+        iterative deepening within `time_limit` seconds, or None if the
+        game is over.
+
+        The search deepens one ply at a time and returns the move of
+        the deepest completed iteration. It also stops when
+        `should_stop()` returns True, and after `max_depth` plies.
+        """
+        if self.terminal(board):
+            return None
+        x, o = self.from_board(board)
+        if x.bit_count() <= o.bit_count():
+            me, opponent = x, o
+        else:
+            me, opponent = o, x
+
+        deadline = time.perf_counter() + time_limit
+        self.killers = {}
+        self.nodes_searched = 0
+        moves = self._candidates(me, opponent)
+        best = moves[0]
+        depth = 1
+        empty = self.size - (me | opponent).bit_count()
+        while depth <= min(max_depth or empty, empty):
+            try:
+                value, move = self._root(me, opponent, depth, deadline,
+                                         should_stop)
+            except _Timeout:
+                break
+            best = move
+            if abs(value) >= WIN - self.size:
+                break
+            depth += 1
+        return self.cell(best)
+
+    def _root(self, me, opponent, depth, deadline, should_stop):
+        """
+        Searches every candidate move to `depth` plies and returns
+        (value, best move) for the player to move.
+        """
+        self._deadline = deadline
+        self._should_stop = should_stop
+        value, move = self._negamax(me, opponent, depth, -WIN - 1, WIN + 1,
+                                    0, None)
+        return value, move
+
+    def _negamax(self, me, opponent, depth, alpha, beta, ply, last):
+        """
+        Returns (value, best move) of a position for the player to move
+        (`me`), where `last` is the opponent's previous move.
+        """
+        self.nodes_searched += 1
+        if self.nodes_searched & 255 == 0:
+            if (time.perf_counter() > self._deadline
+                    or (self._should_stop and self._should_stop())):
+                raise _Timeout
+
+        if last is not None:
+            for line in self.lines_through[last]:
+                if opponent & line == line:
+                    return -(WIN - ply), None
+        if (me | opponent) == self.full:
+            return 0, None
+        if depth == 0:
+            return self.evaluate(me, opponent), None
+
+        key = (me, opponent)
+        entry = self.transposition_table.get(key)
+        hint = None
+        if entry is not None:
+            entry_depth, value, bound, hint = entry
+            value = self._from_table(value, ply)
+            if entry_depth >= depth and (
+                    bound == EXACT
+                    or (bound == LOWER and value >= beta)
+                    or (bound == UPPER and value <= alpha)):
+                return value, hint
+
+        original_alpha = alpha
+        best_value = -WIN - 1
+        best_move = None
+        for move in self._ordered(me, opponent, ply, hint):
+            value = -self._negamax(opponent, me | 1 << move, depth - 1,
+                                   -beta, -alpha, ply + 1, move)[0]
+            if value > best_value:
+                best_value, best_move = value, move
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                # Remember quiet refutations for sibling positions
+                killers = self.killers.setdefault(ply, [])
+                if move not in killers:
+                    killers.insert(0, move)
+                    del killers[2:]
+                self.history[move] = self.history.get(move, 0) + depth * depth
+                break
+
+        if best_value <= original_alpha:
+            bound = UPPER
+        elif best_value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.transposition_table[key] = (
+            depth, self._to_table(best_value, ply), bound, best_move)
+        return best_value, best_move
+
+    def _to_table(self, value, ply):
+        """
+        Returns a value as stored in the transposition table, with win
+        scores counted from the stored position instead of the root.
+        """
+        if value >= WIN - self.size:
+            return value + ply
+        if value <= -(WIN - self.size):
+            return value - ply
+        return value
+
+    def _from_table(self, value, ply):
+        """
+        Returns a stored transposition table value as seen from the root.
+        """
+        if value >= WIN - self.size:
+            return value - ply
+        if value <= -(WIN - self.size):
+            return value + ply
+        return value
+
+    def _candidates(self, me, opponent):
+        """
+        Returns the empty cells worth searching: all of them on small
+        boards, else those within two cells of a mark.
+        """
+        occupied = me | opponent
+        if self.size <= 25:
+            empty = self.full & ~occupied
+        elif not occupied:
+            return [self.bit(self.rows // 2, self.cols // 2)]
+        else:
+            near = 0
+            stones = occupied
+            while stones:
+                low = stones & -stones
+                near |= self.nearby[low.bit_length() - 1]
+                stones ^= low
+            empty = near & ~occupied
+        moves = []
+        while empty:
+            low = empty & -empty
+            moves.append(low.bit_length() - 1)
+            empty ^= low
+        return moves
+
+    def _ordered(self, me, opponent, ply, hint):
+        """
+        Returns candidate moves ordered by the transposition table hint,
+        then killer moves at this ply, then history score.
+        """
+        moves = self._candidates(me, opponent)
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def priority(move):
+            if move == hint:
+                return (0, 0)
+            if move in killers:
+                return (1, killers.index(move))
+            return (2, -history.get(move, 0))
+
+        moves.sort(key=priority)
+        return moves
+
+    def evaluate(self, me, opponent):
+        """
+        Returns a heuristic value for the player to move: open lines
+        holding only that player's marks count for it, weighted by how
+        full they are, and the opponent's count against it.
+        """
+        weights = self.weights
+        score = 0
+        for line in self.lines:
+            mine = me & line
+            theirs = opponent & line
+            if mine and not theirs:
+                score += weights[mine.bit_count()]
+            elif theirs and not mine:
+                score -= weights[theirs.bit_count()]
+        return score
@@ -1,9 +1,39 @@
 import pygame
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mnk
 import tictactoe as ttt
 
+# Usage: python runner.py [rows cols k]
+if len(sys.argv) not in (1, 4):
+    sys.exit("Usage: python runner.py [rows cols k]")
+rows, cols, k = map(int, sys.argv[1:]) if len(sys.argv) == 4 else (3, 3, 3)
+game = mnk.Game(rows, cols, k)
+
+# Seconds the computer may think per move on boards other than 3x3
+TIME_LIMIT = 1.0
+
+
+def ai_move(board, cancel):
+    """
+    Returns the computer's move: perfect play on the standard board,
+    else the best move found within the time limit or before `cancel`
+    is set.
+    """
+    if (rows, cols, k) == (3, 3, 3):
+        return ttt.minimax(board)
+    return game.best_move(board, time_limit=TIME_LIMIT,
+                          should_stop=cancel.is_set)
+
+
+# The computer thinks on a worker thread, so the window keeps drawing
+# and handling events while it searches
+executor = ThreadPoolExecutor(max_workers=1)
+
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -15,16 +45,26 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+# Fit the board between the title and the bottom button
+tile_size = min(80, (height - 150) // rows, (width - 40) // cols)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = game.initial_state()
+
+# Future of the computer's move while it is thinking, and the event
+# that cancels that search
+pending = None
+cancel = threading.Event()
+
+clock = pygame.time.Clock()
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel.set()
             sys.exit()
 
     screen.fill(black)
@@ -33,7 +73,11 @@ while True:
     if user is None:
 
         # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
+        if (rows, cols, k) == (3, 3, 3):
+            title = "Play Tic-Tac-Toe"
+        else:
+            title = f"Play {rows},{cols},{k} Tic-Tac-Toe"
+        title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 50)
         screen.blit(title, titleRect)
@@ -67,13 +111,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +132,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board)
+        player = game.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,30 +145,30 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            dots = "." * (pygame.time.get_ticks() // 400 % 4)
+            title = f"Computer thinking{dots:<3}"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the computer's search, and make its move once found
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if pending is None:
+                cancel = threading.Event()
+                pending = executor.submit(ai_move, board, cancel)
+            elif pending.done():
+                board = game.result(board, pending.result())
+                pending = None
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
+                        board = game.result(board, (i, j))
 
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
@@ -140,7 +183,9 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    board = game.initial_state()
+                    cancel.set()
+                    pending = None
 
     pygame.display.flip()
+    clock.tick(60)
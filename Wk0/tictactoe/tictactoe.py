@@ -1,13 +1,26 @@
 """
 Tic Tac Toe Player
 """
-import copy
 import math
 
+import bitboard
+
 X = "X"
 O = "O"
 EMPTY = None
 
+# Bound types of transposition table values
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maps a position (flattened board) to (value, bound type, best move),
+# shared by every search in the process
+transposition_table = {}
+
+# Number of positions visited by searches, for benchmarking
+nodes_searched = 0
+
 
 def initial_state():
     """
@@ -22,122 +35,85 @@ def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    count_x = sum(row.count(X) for row in board)
-    count_o = sum(row.count(O) for row in board)
-
-    if count_x == 0 or count_x <= count_o:
-        return X
-    else:
-        return O
-
-    raise NotImplementedError
+    return bitboard.player(*bitboard.from_board(board))
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    # create action set
-    action = set()
-
-    # loop through the board and add any empty cells into possible set of actions
-    for i in range(0,3):
-        for j in range(0,3):
-            if board[i][j] == EMPTY:
-                action.add((i, j))
-
-    return action
-
-    raise NotImplementedError
+    return {bitboard.CELLS[bit]
+            for bit in bitboard.actions(*bitboard.from_board(board))}
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    # deepcopy of board    
-    new_board = copy.deepcopy(board)
-
     # check if action is possible
-    if action not in actions(board):
+    i, j = action
+    if not (0 <= i < 3 and 0 <= j < 3) or board[i][j] != EMPTY:
         raise ValueError('This move is not allowed')
 
-    # place move by player who has their turn 
-    new_board[action[0]][action[1]] = player(new_board)
+    # copy of board with the move placed by player who has their turn
+    new_board = [row[:] for row in board]
+    new_board[i][j] = player(board)
 
     return new_board
 
-    raise NotImplementedError
-
 
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    # check row
-    for i in range(3):
-        row = board[i]
-        # check that all values == first value of each row
-        if all(cell == row[0] for cell in row) and row[0] != EMPTY:
-            return row[0]
-
-    # check col
-    for j in range(3):
-        col = [row[j] for row in board]
-        # check that all values == first value of each col
-        if all(cell == col[0] for cell in col) and col[0] != EMPTY:
-            return col[0]
-    
-    # check diagonal
-    if board[0][0] == board[1][1] == board[2][2] != EMPTY:
-        return board[0][0]
-    if board[0][2] == board[1][1] == board[2][0] != EMPTY:
-        return board[0][2]
-    
-    return None
-
+    return bitboard.winner(*bitboard.from_board(board))
 
 
-    raise NotImplementedError
-
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    count_x = sum(row.count(X) for row in board)
-    count_o = sum(row.count(O) for row in board)
-
-    # if either player wins
-    if winner(board) == X or winner(board) == O:
-        return True
-    # draw
-    elif count_x + count_o == 9:
-        return True 
-    else:
-        return False
-
-    raise NotImplementedError
+    return bitboard.terminal(*bitboard.from_board(board))
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-
-    if winner(board) == X:
-        return 1
-    elif winner(board) == O:
-        return -1
-    else:
-        return 0
-
-    raise NotImplementedError
+    return bitboard.utility(*bitboard.from_board(board))
 
 
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
     """
+    move = bitboard.minimax(*bitboard.from_board(board))
+    if move is None:
+        return None
+    return bitboard.CELLS[move]
+
+
+def memoized_minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    searching list-of-lists boards with a transposition table.
+    """
+    if terminal(board) is True:
+        return None
+
+    # The search places and undoes moves on its own copy of the board
+    board = [row[:] for row in board]
+    empty = sum(row.count(EMPTY) for row in board)
+    v, action = memoized_value(board, player(board), empty,
+                               float("-inf"), float("inf"))
+    return action
+
+
+def alpha_beta(board):
+    """
+    Returns the optimal action for the current player on the board,
+    searching the whole game tree without a transposition table.
+    """
     if terminal(board) is True:
         return None
     
@@ -152,8 +128,75 @@ def minimax(board):
         return action
 
 
+def memoized_value(board, turn, empty, alpha, beta):
+    """
+    Returns [value, best move] of the board for `turn` to move with
+    `empty` empty cells, using and filling the transposition table.
+
+    The value is exact when it lies strictly between alpha and beta,
+    and otherwise a bound on the exact value in that direction.
+    """
+    global nodes_searched
+    nodes_searched += 1
+
+    key = tuple(cell for row in board for cell in row)
+    entry = transposition_table.get(key)
+    if entry is not None:
+        value, bound, move = entry
+        if (bound == EXACT
+                or (bound == LOWER and value >= beta)
+                or (bound == UPPER and value <= alpha)):
+            return [value, move]
+
+    won = winner(board)
+    if won is not None or empty == 0:
+        value = 1 if won == X else -1 if won == O else 0
+        transposition_table[key] = (value, EXACT, None)
+        return [value, None]
+
+    original_alpha, original_beta = alpha, beta
+    maximizing = turn == X
+    opponent = O if maximizing else X
+    v = float("-inf") if maximizing else float("inf")
+    move = None
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] != EMPTY:
+                continue
+            board[i][j] = turn
+            value = memoized_value(board, opponent, empty - 1, alpha, beta)[0]
+            board[i][j] = EMPTY
+
+            # save the best move and narrow the window
+            if maximizing and value > v or not maximizing and value < v:
+                v = value
+                move = (i, j)
+            if maximizing:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+
+            # prune
+            if alpha >= beta:
+                break
+        if alpha >= beta:
+            break
+
+    if v <= original_alpha:
+        bound = UPPER
+    elif v >= original_beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    transposition_table[key] = (v, bound, move)
+    return [v, move]
+
+
 # Functions for alpha beta pruning
 def max_value(board, alpha, beta):
+    global nodes_searched
+    nodes_searched += 1
+
     # the game has ended, there is nothing to maximize
 
     if terminal(board) is True:
@@ -178,6 +221,9 @@ def max_value(board, alpha, beta):
 
 
 def min_value(board, alpha, beta):
+    global nodes_searched
+    nodes_searched += 1
+
     # the game has ended, there is nothing to maximize
 
     if terminal(board) is True:
@@ -0,0 +1,99 @@
+"""
+Generates knights-and-knaves puzzles in bulk and solves them all.
+
+Each puzzle is solved in one pass: every "is a Knight" and "is a
+Knave" query is answered together by logic.model_check_all, from one
+truth table of the knowledge base or one SAT solver, instead of one
+full model check per query. Solutions are checked against the hidden
+assignment each puzzle was generated from.
+
+Usage: python batch.py [puzzles] [--characters N] [--statements N]
+                       [--unique] [--method METHOD] [--seed SEED]
+"""
+import argparse
+import random
+import time
+
+import generate
+import logic
+
+
+def solve(puzzle, method="auto"):
+    """
+    Returns, for each character of a generate.Puzzle, True if they must
+    be a knight, False if they must be a knave, and None if unknown.
+    """
+    characters = len(puzzle.names)
+    entailed = logic.model_check_all(puzzle.knowledge, puzzle.symbols(),
+                                     method)
+    solution = []
+    for knight, knave in zip(entailed[:characters], entailed[characters:]):
+        if knight and knave:
+            raise ValueError("puzzle has no solution")
+        solution.append(True if knight else False if knave else None)
+    return solution
+
+
+def make_puzzles(count, characters, statements=None, seed=None):
+    """
+    Returns `count` puzzles. Each has a unique solution, or exactly
+    `statements` statements if that is given.
+    """
+    rng = random.Random(seed)
+    if statements is None:
+        return [generate.generate(characters, rng.random())
+                for _ in range(count)]
+    return [generate.random_puzzle(characters, statements, rng)
+            for _ in range(count)]
+
+
+def solve_all(puzzles, method="auto"):
+    """
+    Returns the solution of each puzzle, checking every known character
+    against the hidden assignment.
+    """
+    solutions = [solve(puzzle, method) for puzzle in puzzles]
+    for puzzle, solution in zip(puzzles, solutions):
+        for known, hidden in zip(solution, puzzle.solution):
+            if known is not None and known != hidden:
+                raise AssertionError("puzzle solved incorrectly")
+    return solutions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate and solve knights-and-knaves puzzles.")
+    parser.add_argument("puzzles", nargs="?", type=int, default=1000)
+    parser.add_argument("--characters", type=int, default=3)
+    parser.add_argument("--statements", type=int, default=3,
+                        help="statements per puzzle")
+    parser.add_argument("--unique", action="store_true",
+                        help="add statements until each solution is unique")
+    parser.add_argument("--method", default="auto",
+                        help="method passed to logic.model_check_all")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    puzzles = make_puzzles(args.puzzles, args.characters,
+                           None if args.unique else args.statements,
+                           args.seed)
+    generated = time.perf_counter() - start
+
+    start = time.perf_counter()
+    solutions = solve_all(puzzles, args.method)
+    solved = time.perf_counter() - start
+
+    known = sum(answer is not None
+                for solution in solutions for answer in solution)
+    queries = 2 * args.characters * len(puzzles)
+    print(f"Generated {len(puzzles)} puzzles in {generated:.3f}s")
+    print(f"Solved them in {solved:.3f}s: "
+          f"{len(puzzles) / solved:.0f} puzzles/s, "
+          f"{solved / queries * 1e6:.1f}us per query")
+    print(f"{known} of {args.characters * len(puzzles)} characters "
+          f"determined")
+
+
+if __name__ == "__main__":
+    main()
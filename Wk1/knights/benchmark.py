@@ -0,0 +1,305 @@
+"""
+Compares model checking methods on the puzzle.py knowledge bases.
+
+Runs every section, or only the one named: "methods" (puzzle.py, chain
+and generated puzzles), "incremental", "batch", "parallel" or
+"construction".
+
+Usage: python benchmark.py [section] [--repeat N]
+"""
+import argparse
+import os
+import random
+import time
+import tracemalloc
+
+import batch
+import generate
+import logic
+import puzzle
+
+# Most symbols the enumerating methods are run on
+ENUMERATED_SYMBOLS = 16
+
+PUZZLES = [
+    ("Puzzle 0", puzzle.knowledge0),
+    ("Puzzle 1", puzzle.knowledge1),
+    ("Puzzle 2", puzzle.knowledge2),
+    ("Puzzle 3", puzzle.knowledge3)
+]
+
+SYMBOLS = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight, puzzle.BKnave,
+           puzzle.CKnight, puzzle.CKnave]
+
+
+def chain_puzzle(characters):
+    """
+    Returns (knowledge, symbols) of a puzzle where each character says
+    "the next character is a knave", and the last says "the first
+    character is a knight".
+    """
+    knights = [logic.Symbol(f"{i} is a Knight") for i in range(characters)]
+    knaves = [logic.Symbol(f"{i} is a Knave") for i in range(characters)]
+    knowledge = logic.And()
+    for i in range(characters):
+        knowledge.add(logic.Or(knights[i], knaves[i]))
+        knowledge.add(logic.Not(logic.And(knights[i], knaves[i])))
+        if i + 1 < characters:
+            knowledge.add(logic.Biconditional(knights[i], knaves[i + 1]))
+        else:
+            knowledge.add(logic.Biconditional(knights[i], knights[0]))
+    return knowledge, knights + knaves
+
+
+def large_knowledge(clauses, characters, seed=0):
+    """
+    Returns a knowledge base of `clauses` clauses in the style of
+    puzzle.py: random statements from the generator's templates, each
+    true if and only if its speaker is a knight.
+    """
+    rng = random.Random(seed)
+    knowledge = logic.And()
+    for _ in range(clauses // 2):
+        s, t, u = (rng.randrange(characters) for _ in range(3))
+        build = rng.choice(generate.TEMPLATES)[1]
+        statement = build(logic.Symbol(f"{t} is a Knight"),
+                          logic.Symbol(f"{t} is a Knave"),
+                          logic.Symbol(f"{u} is a Knight"),
+                          logic.Symbol(f"{u} is a Knave"))
+        knowledge.add(logic.Implication(logic.Symbol(f"{s} is a Knight"),
+                                        statement))
+        knowledge.add(logic.Implication(logic.Symbol(f"{s} is a Knave"),
+                                        logic.Not(statement)))
+    return knowledge
+
+
+def measure_construction(clauses, characters):
+    """
+    Prints the time and memory it takes to build a large knowledge
+    base, and the time of its symbols() and hash.
+    """
+    print(f"Knowledge base of {clauses} clauses over "
+          f"{2 * characters} symbols")
+    start = time.perf_counter()
+    knowledge = large_knowledge(clauses, characters)
+    print(f"  construction: {time.perf_counter() - start:8.3f}s")
+    del knowledge
+
+    tracemalloc.start()
+    knowledge = large_knowledge(clauses, characters)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"        memory: {size / 2 ** 20:8.1f} MiB")
+
+    for name, function in (("symbols()", knowledge.symbols),
+                           ("hash", lambda: hash(knowledge))):
+        start = time.perf_counter()
+        function()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(10):
+            function()
+        again = (time.perf_counter() - start) / 10
+        print(f"  {name:>12}: {first * 1e3:8.3f}ms first call, "
+              f"{again * 1e3:8.3f}ms after")
+
+
+def measure_incremental(characters):
+    """
+    Prints the time per query of a KnowledgeBase as facts are added one
+    at a time, against model checking the facts so far from scratch.
+    """
+    generated = generate.generate(characters, seed=characters)
+    facts = generated.knowledge.conjuncts
+    print(f"Incremental knowledge base, {characters} characters, "
+          f"{len(facts)} facts")
+    print(f"  {'facts':>7} {'KnowledgeBase':>15} {'from scratch':>15}")
+    knowledge = logic.KnowledgeBase()
+    checkpoints = {len(facts) * step // 10 for step in range(1, 11)}
+    for count, fact in enumerate(facts, 1):
+        knowledge.add(fact)
+        if count not in checkpoints:
+            continue
+        start = time.perf_counter()
+        incremental = [knowledge.entails(symbol)
+                       for symbol in generated.knights]
+        incremental_time = time.perf_counter() - start
+
+        so_far = logic.And(*facts[:count])
+        start = time.perf_counter()
+        scratch = [logic.model_check(so_far, symbol)
+                   for symbol in generated.knights]
+        scratch_time = time.perf_counter() - start
+        if incremental != scratch:
+            raise AssertionError("KnowledgeBase disagrees with model_check")
+        print(f"  {count:>7} "
+              f"{incremental_time / characters * 1e6:13.1f}us "
+              f"{scratch_time / characters * 1e6:13.1f}us")
+
+
+def measure_parallel(characters, workers):
+    """
+    Prints the time of a full truth table check of a chain puzzle, and
+    of one stopped early by a counter-model, for each worker count.
+    The chain needs an odd number of characters to be consistent.
+    """
+    knowledge, symbols = chain_puzzle(characters)
+    # Entailed: every model of the chain alternates knights and knaves
+    entailed = logic.Biconditional(symbols[0], symbols[characters + 1])
+    refuted = symbols[0]
+    print(f"Parallel model checking, chain of {characters} "
+          f"({2 * characters} symbols), {os.cpu_count()} cores")
+    print(f"  {'workers':>7} {'entailed':>10} {'speedup':>8} "
+          f"{'refuted':>10}")
+    baseline = None
+    for count in workers:
+        start = time.perf_counter()
+        holds = logic.parallel_model_check(knowledge, entailed, count)
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        refutes = not logic.parallel_model_check(knowledge, refuted, count)
+        early = time.perf_counter() - start
+        if not (holds and refutes):
+            raise AssertionError("parallel model checking is wrong")
+        baseline = baseline or full
+        print(f"  {count:>7} {full:9.3f}s {baseline / full:7.2f}x "
+              f"{early:9.3f}s")
+
+
+def measure_batch(sizes, count):
+    """
+    Prints puzzles solved per second and time per query for batches of
+    random puzzles of each size, solved with one model_check_all per
+    puzzle and with one model_check per query.
+    """
+    print(f"Batches of {count} random puzzles, two statements per character")
+    print(f"  {'characters':>10} {'batch puzzles/s':>16} {'us/query':>9} "
+          f"{'per query puzzles/s':>20} {'us/query':>9}")
+    for characters in sizes:
+        puzzles = batch.make_puzzles(count, characters, 2 * characters,
+                                     seed=characters)
+        queries = 2 * characters * count
+        start = time.perf_counter()
+        solutions = batch.solve_all(puzzles)
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        separate = [[logic.model_check(puzzle.knowledge, symbol)
+                     for symbol in puzzle.symbols()] for puzzle in puzzles]
+        single = time.perf_counter() - start
+        for solution, entailed in zip(solutions, separate):
+            if [knight is True for knight in solution] != \
+                    entailed[:characters]:
+                raise AssertionError("batch disagrees with model_check")
+        print(f"  {characters:>10} {count / batched:16.0f} "
+              f"{batched / queries * 1e6:9.1f} "
+              f"{count / single:20.0f} {single / queries * 1e6:9.1f}")
+
+
+def time_queries(method, knowledge, symbols, repeat):
+    """
+    Returns (seconds per query, entailed symbols) for asking about
+    every symbol `repeat` times.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        entailed = [symbol for symbol in symbols
+                    if logic.model_check(knowledge, symbol, method=method)]
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(symbols)), entailed
+
+
+def compare(name, knowledge, symbols, methods, repeat):
+    """
+    Prints the time per query of each method, checking they agree, and
+    returns the entailed symbols.
+    """
+    count = len(set.union(knowledge.symbols(),
+                          *[symbol.symbols() for symbol in symbols]))
+    print(f"{name} ({count} symbols with the queries)")
+    baseline = None
+    answers = None
+    for method in methods:
+        seconds, entailed = time_queries(method, knowledge, symbols, repeat)
+        if answers is None:
+            answers = entailed
+        elif entailed != answers:
+            raise AssertionError(f"{method} disagrees on {name}")
+        baseline = baseline or seconds
+        print(f"  {method:>10}: {seconds * 1e6:12.1f}us per query "
+              f"({baseline / seconds:6.1f}x)")
+    return answers
+
+
+def compare_methods(args):
+    """
+    Compares the model checking methods on the puzzle.py puzzles, a
+    chain puzzle and generated puzzles.
+    """
+    for name, knowledge in PUZZLES:
+        compare(name, knowledge, SYMBOLS, args.methods, args.repeat)
+
+    knowledge, symbols = chain_puzzle(args.characters)
+    compare(f"Chain of {args.characters}", knowledge, symbols[:2],
+            args.methods, 1)
+
+    # Generated puzzles, where only the SAT solver scales
+    for characters in args.generated:
+        generated = generate.generate(characters, seed=characters)
+        methods = [method for method in args.methods if method == "sat"
+                   or 2 * characters <= ENUMERATED_SYMBOLS]
+        entailed = compare(f"Generated, {characters} characters",
+                           generated.knowledge, generated.knights, methods, 1)
+        expected = [knight for knight, is_knight in
+                    zip(generated.knights, generated.solution) if is_knight]
+        if entailed != expected:
+            raise AssertionError("generated puzzle solved incorrectly")
+
+
+SECTIONS = {
+    "methods": compare_methods,
+    "incremental": lambda args: measure_incremental(args.incremental),
+    "batch": lambda args: measure_batch(args.batch, args.batch_size),
+    "parallel": lambda args: measure_parallel(args.parallel, args.workers),
+    "construction": lambda args: measure_construction(args.clauses, 50)
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare model checking methods on the puzzles.")
+    parser.add_argument("section", nargs="?", default="all",
+                        choices=["all"] + list(SECTIONS),
+                        help="section of the benchmark to run")
+    parser.add_argument("--repeat", type=int, default=200,
+                        help="times to ask each query")
+    parser.add_argument("--methods", nargs="+",
+                        default=["enumerate", "compiled", "vector", "sat"])
+    parser.add_argument("--characters", type=int, default=8,
+                        help="characters in the scaled-up chain puzzle")
+    parser.add_argument("--generated", type=int, nargs="*",
+                        default=[5, 10, 20, 40, 80],
+                        help="character counts of generated puzzles")
+    parser.add_argument("--clauses", type=int, default=100000,
+                        help="clauses in the construction benchmark")
+    parser.add_argument("--incremental", type=int, default=40,
+                        help="characters in the incremental benchmark")
+    parser.add_argument("--batch", type=int, nargs="*",
+                        default=[2, 3, 4, 6, 8, 12, 20, 40],
+                        help="character counts of the batch benchmark")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="puzzles per batch")
+    parser.add_argument("--parallel", type=int, default=15,
+                        help="characters in the parallel benchmark (odd)")
+    parser.add_argument("--workers", type=int, nargs="*",
+                        default=[1, 2, 4, 8, 16],
+                        help="worker counts in the parallel benchmark")
+    args = parser.parse_args()
+
+    for name, section in SECTIONS.items():
+        if args.section in ("all", name):
+            section(args)
+
+
+if __name__ == "__main__":
+    main()
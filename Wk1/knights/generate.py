@@ -0,0 +1,176 @@
+"""
+Generator of knights-and-knaves puzzles with any number of characters.
+
+Every character is secretly a knight or a knave. Characters make
+statements about each other that are true when a knight speaks and
+false when a knave does, and statements are added until the hidden
+assignment is the only one consistent with all of them, which is
+checked with a SAT solver. With --statements, a fixed number of
+statements is made instead, which may leave some characters unknown.
+
+Usage: python generate.py [characters] [--statements N] [--seed SEED]
+"""
+import argparse
+import random
+import string
+
+from logic import *
+
+# Statement templates: (text, sentence builder over the knight and
+# knave symbols of two characters t and u)
+TEMPLATES = [
+    ("{t} is a knight.", lambda kt, nt, ku, nu: kt),
+    ("{t} is a knave.", lambda kt, nt, ku, nu: nt),
+    ("{t} and {u} are the same kind.",
+     lambda kt, nt, ku, nu: Biconditional(kt, ku)),
+    ("{t} and {u} are of different kinds.",
+     lambda kt, nt, ku, nu: Not(Biconditional(kt, ku))),
+    ("At least one of {t} and {u} is a knave.",
+     lambda kt, nt, ku, nu: Or(nt, nu)),
+    ("{t} and {u} are both knights.",
+     lambda kt, nt, ku, nu: And(kt, ku)),
+    ("If {t} is a knight, then so is {u}.",
+     lambda kt, nt, ku, nu: Implication(kt, ku))
+]
+
+
+class Puzzle():
+
+    def __init__(self, names, solution):
+        self.names = names
+        self.solution = solution
+        self.knights = [Symbol(f"{name} is a Knight") for name in names]
+        self.knaves = [Symbol(f"{name} is a Knave") for name in names]
+        self.statements = []
+        self.model = {}
+        for knight, knave, is_knight in zip(self.knights, self.knaves,
+                                            solution):
+            self.model[knight.name] = is_knight
+            self.model[knave.name] = not is_knight
+
+        # Every character is a knight or a knave, and not both
+        self.knowledge = And()
+        for knight, knave in zip(self.knights, self.knaves):
+            self.knowledge.add(Or(knight, knave))
+            self.knowledge.add(Not(And(knight, knave)))
+
+    def symbols(self):
+        return self.knights + self.knaves
+
+    def say(self, speaker, text, sentence):
+        """
+        Records that character `speaker` says `sentence`.
+        """
+        self.statements.append((speaker, text))
+        self.knowledge.add(Implication(self.knights[speaker], sentence))
+        self.knowledge.add(Implication(self.knaves[speaker], Not(sentence)))
+
+    def say_random(self, rng, subject=None):
+        """
+        Has a random character say a random statement, true if the
+        speaker is a knight in the solution, about character `subject`
+        (random if None) and maybe one other.
+        """
+        characters = len(self.names)
+        if subject is None:
+            subject = rng.randrange(characters)
+        speaker = rng.randrange(characters)
+        other = rng.randrange(characters)
+        t, u = (subject, other) if rng.random() < 0.5 else (other, subject)
+        while True:
+            text, build = rng.choice(TEMPLATES)
+            sentence = build(self.knights[t], self.knaves[t],
+                             self.knights[u], self.knaves[u])
+            if sentence.evaluate(self.model) == self.solution[speaker]:
+                break
+        self.say(speaker, text.format(t=self.names[t], u=self.names[u]),
+                 sentence)
+
+    def __str__(self):
+        return "\n".join(f'{self.names[speaker]} says "{text}"'
+                         for speaker, text in self.statements)
+
+
+def character_name(i):
+    """
+    Returns the name of character i: A to Z, then AA, AB and so on.
+    """
+    name = ""
+    i += 1
+    while i:
+        i, letter = divmod(i - 1, 26)
+        name = string.ascii_uppercase[letter] + name
+    return name
+
+
+def random_puzzle(characters, statements, rng=None):
+    """
+    Returns a Puzzle with `characters` characters, a random solution
+    and `statements` random statements, which need not determine it.
+    """
+    rng = rng or random.Random()
+    names = [character_name(i) for i in range(characters)]
+    puzzle = Puzzle(names, [rng.random() < 0.5 for _ in range(characters)])
+    for _ in range(statements):
+        puzzle.say_random(rng)
+    return puzzle
+
+
+def generate(characters, seed=None):
+    """
+    Returns a Puzzle with `characters` characters and a unique solution.
+    """
+    rng = random.Random(seed)
+    puzzle = random_puzzle(characters, 0, rng)
+    solution = puzzle.solution
+
+    encoder = Encoder()
+    added = 0
+    mentioned = list(range(characters))
+    while True:
+        # A new statement about each character still in doubt
+        for subject in mentioned:
+            puzzle.say_random(rng, subject)
+        for sentence in puzzle.knowledge.conjuncts[added:]:
+            encoder.add(sentence)
+        added = len(puzzle.knowledge.conjuncts)
+
+        # Look for another solution; statements about the characters
+        # it disagrees on come next
+        differs = encoder.new_literal()
+        encoder.clause(-differs, *[
+            -encoder.literal(knight) if is_knight else encoder.literal(knight)
+            for knight, is_knight in zip(puzzle.knights, solution)
+        ])
+        found = encoder.solver.solve([differs])
+        if found:
+            mentioned = [i for i, knight in enumerate(puzzle.knights)
+                         if encoder.solver.value(encoder.literal(knight))
+                         != solution[i]]
+        encoder.clause(-differs)
+        if not found:
+            return puzzle
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a knights-and-knaves puzzle.")
+    parser.add_argument("characters", nargs="?", type=int, default=4)
+    parser.add_argument("--statements", type=int,
+                        help="make this many statements, unique or not")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.statements is None:
+        puzzle = generate(args.characters, args.seed)
+    else:
+        puzzle = random_puzzle(args.characters, args.statements,
+                               random.Random(args.seed))
+    print(puzzle)
+    print()
+    for name, knight in zip(puzzle.names, puzzle.solution):
+        print(f"    {name} is a {'Knight' if knight else 'Knave'}")
+
+
+if __name__ == "__main__":
+    main()
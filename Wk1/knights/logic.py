@@ -1,8 +1,37 @@
+import functools
 import itertools
+import multiprocessing
+import os
+import weakref
+
+import sat
+
+# Sentences with no And inside can never change, so each is built only
+# once: constructors look up the existing equal sentence here, keyed by
+# class and operands, through a weak reference that removes its entry
+# when the sentence is collected
+_interned = {}
+
+
+def _lookup(key):
+    """Returns the interned sentence for `key`, or None."""
+    ref = _interned.get(key)
+    return None if ref is None else ref()
+
+
+def _forget(ref):
+    if _interned.get(ref.key) is ref:
+        del _interned[ref.key]
 
 
 class Sentence():
 
+    # _hash and _symbols cache the hash and the frozenset of symbol
+    # names. Sentences with an And inside are _mutable, since an And can
+    # grow; they are not interned and keep weak references to the
+    # mutable sentences containing them in _parents, to clear caches
+    __slots__ = ("_hash", "_symbols", "_mutable", "_parents", "__weakref__")
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,7 +42,72 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns a frozenset of all symbols in the logical sentence."""
+        if self._symbols is None:
+            self._symbols = frozenset().union(
+                *[child.symbol_set() for child in self._children()])
+        return self._symbols
+
+    def expression(self, index):
+        """
+        Returns a Python expression that evaluates the sentence over an
+        int `m` of truth values, where `index` maps each symbol name to
+        its bit in `m`.
+        """
+        raise Exception("nothing to evaluate")
+
+    def tseitin(self, encoder):
+        """
+        Returns a SAT literal equivalent to the sentence, adding the
+        clauses that define it through `encoder`.
+        """
+        raise Exception("nothing to encode")
+
+    def truth_table(self, columns, ones):
+        """
+        Returns an int whose bit j is the sentence's truth value in
+        model j, given each symbol's `columns` int and `ones`, the int
+        with a bit set for every model.
+        """
+        raise Exception("nothing to evaluate")
+
+    def _children(self):
+        """Returns the sentences this sentence is built from."""
+        return ()
+
+    def _setup(self, key, mutable):
+        """
+        Initializes the caches of a newly built sentence, and interns it
+        under `key` unless it is mutable, being or containing an And.
+        """
+        self._hash = self._symbols = None
+        self._mutable = mutable
+        if mutable:
+            self._parents = []
+            for child in self._children():
+                self._adopt(child)
+        else:
+            self._parents = None
+            _interned[key] = weakref.KeyedRef(self, _forget, key)
+
+    def _adopt(self, child):
+        """Registers this sentence as containing a mutable child."""
+        if child._mutable:
+            child._parents.append(weakref.ref(self))
+
+    def _changed(self):
+        """
+        Clears the caches of this sentence and of every sentence that
+        contains it.
+        """
+        self._hash = self._symbols = None
+        parents = [ref for ref in self._parents if ref() is not None]
+        self._parents = parents
+        for ref in parents:
+            ref()._changed()
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +137,28 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
-    def __init__(self, name):
-        self.name = name
+    def __new__(cls, name):
+        key = (cls, name)
+        self = _lookup(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.name = name
+            self._setup(key, False)
+        return self
+
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name)
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is None:
+            self._hash = hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -65,20 +172,46 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset((self.name,))
+        return self._symbols
+
+    def expression(self, index):
+        return f"(m >> {index[self.name]} & 1)"
+
+    def tseitin(self, encoder):
+        return encoder.variable(self.name)
+
+    def truth_table(self, columns, ones):
+        return columns[self.name]
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        key = (cls, operand)
+        mutable = operand._mutable
+        self = None if mutable else _lookup(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.operand = operand
+            self._setup(key, mutable)
+        return self
+
+    def __reduce__(self):
+        return (Not, (self.operand,))
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is None:
+            self._hash = hash(("not", hash(self.operand)))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +222,41 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def _children(self):
+        return (self.operand,)
+
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def tseitin(self, encoder):
+        return -encoder.literal(self.operand)
+
+    def truth_table(self, columns, ones):
+        return ones ^ self.operand.truth_table(columns, ones)
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self._setup(None, True)
+
+    def __reduce__(self):
+        return (And, tuple(self.conjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts)
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -116,6 +267,8 @@ class And(Sentence):
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        self._adopt(conjunct)
+        self._changed()
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +279,60 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def _children(self):
+        return self.conjuncts
+
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(conjunct.expression(index)
+                                  for conjunct in self.conjuncts) + ")"
+
+    def tseitin(self, encoder):
+        literals = [encoder.literal(conjunct) for conjunct in self.conjuncts]
+        gate = encoder.new_literal()
+        for literal in literals:
+            encoder.clause(-gate, literal)
+        encoder.clause(gate, *[-literal for literal in literals])
+        return gate
+
+    def truth_table(self, columns, ones):
+        table = ones
+        for conjunct in self.conjuncts:
+            table &= conjunct.truth_table(columns, ones)
+            if not table:
+                break
+        return table
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        key = (cls, disjuncts)
+        mutable = any(disjunct._mutable for disjunct in disjuncts)
+        self = None if mutable else _lookup(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.disjuncts = list(disjuncts)
+            self._setup(key, mutable)
+        return self
+
+    def __reduce__(self):
+        return (Or, tuple(self.disjuncts))
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +347,61 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def _children(self):
+        return self.disjuncts
+
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(disjunct.expression(index)
+                                 for disjunct in self.disjuncts) + ")"
+
+    def tseitin(self, encoder):
+        literals = [encoder.literal(disjunct) for disjunct in self.disjuncts]
+        gate = encoder.new_literal()
+        for literal in literals:
+            encoder.clause(gate, -literal)
+        encoder.clause(-gate, *literals)
+        return gate
+
+    def truth_table(self, columns, ones):
+        table = 0
+        for disjunct in self.disjuncts:
+            table |= disjunct.truth_table(columns, ones)
+            if table == ones:
+                break
+        return table
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        key = (cls, antecedent, consequent)
+        mutable = antecedent._mutable or consequent._mutable
+        self = None if mutable else _lookup(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.antecedent = antecedent
+            self.consequent = consequent
+            self._setup(key, mutable)
+        return self
+
+    def __reduce__(self):
+        return (Implication, (self.antecedent, self.consequent))
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is None:
+            self._hash = hash(("implies", hash(self.antecedent),
+                               hash(self.consequent)))
+        return self._hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,45 +415,253 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def _children(self):
+        return (self.antecedent, self.consequent)
+
+    def expression(self, index):
+        return (f"(not {self.antecedent.expression(index)} "
+                f"or {self.consequent.expression(index)})")
+
+    def tseitin(self, encoder):
+        antecedent = encoder.literal(self.antecedent)
+        consequent = encoder.literal(self.consequent)
+        gate = encoder.new_literal()
+        encoder.clause(-gate, -antecedent, consequent)
+        encoder.clause(gate, antecedent)
+        encoder.clause(gate, -consequent)
+        return gate
+
+    def truth_table(self, columns, ones):
+        return ((ones ^ self.antecedent.truth_table(columns, ones))
+                | self.consequent.truth_table(columns, ones))
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        key = (cls, left, right)
+        mutable = left._mutable or right._mutable
+        self = None if mutable else _lookup(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.left = left
+            self.right = right
+            self._setup(key, mutable)
+        return self
+
+    def __reduce__(self):
+        return (Biconditional, (self.left, self.right))
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is None:
+            self._hash = hash(("biconditional", hash(self.left),
+                               hash(self.right)))
+        return self._hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
+    def _children(self):
+        return (self.left, self.right)
+
+    def expression(self, index):
+        # Subexpressions are 0, 1, False or True, which compare as bools
+        return (f"({self.left.expression(index)} == "
+                f"{self.right.expression(index)})")
+
+    def tseitin(self, encoder):
+        left = encoder.literal(self.left)
+        right = encoder.literal(self.right)
+        gate = encoder.new_literal()
+        encoder.clause(-gate, -left, right)
+        encoder.clause(-gate, left, -right)
+        encoder.clause(gate, left, right)
+        encoder.clause(gate, -left, -right)
+        return gate
+
+    def truth_table(self, columns, ones):
+        return ones ^ (self.left.truth_table(columns, ones)
+                       ^ self.right.truth_table(columns, ones))
+
+
+# Most symbols "auto" model checking evaluates truth tables for
+VECTOR_SYMBOLS = 16
+
+# Truth tables are evaluated 2 ** TABLE_BITS models at a time
+TABLE_BITS = 20
+
+# Knowledge base, query, split symbols and stop event of a parallel
+# model checking worker process
+_worker = None
+
+
+class Encoder():
+    """
+    Tseitin encoding of sentences into the clauses of a SAT solver.
+    Each symbol and each distinct subsentence gets one variable.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = sat.Solver() if solver is None else solver
+        self.variables = {}
+        self.literals = {}
+
+    def variable(self, name):
+        """
+        Returns the variable of the symbol called `name`.
+        """
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.variables[name] = self.solver.new_variable()
+        return variable
+
+    def new_literal(self):
+        return self.solver.new_variable()
+
+    def clause(self, *literals):
+        self.solver.add_clause(literals)
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, encoding it first if
+        it has not been seen.
+        """
+        literal = self.literals.get(sentence)
+        if literal is None:
+            literal = self.literals[sentence] = sentence.tseitin(self)
+        return literal
+
+    def add(self, sentence):
+        """
+        Adds `sentence` as a fact. Conjunctions are split into separate
+        facts and disjunctions become a single clause.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clause(*[self.literal(disjunct)
+                          for disjunct in sentence.disjuncts])
+        else:
+            self.clause(self.literal(sentence))
+
+
+class KnowledgeBase():
+    """
+    A knowledge base that grows one fact at a time and answers
+    entailment queries from one incremental SAT solver.
+
+    Facts are encoded to clauses once, when added, and each query only
+    encodes the parts of the query not seen before, then solves under
+    the assumption that the query is false. Results are memoized until
+    the next add, except that entailed queries stay entailed, since
+    adding facts never removes a consequence.
+    """
+
+    def __init__(self, *facts):
+        self.knowledge = And()
+        self.encoder = Encoder()
+        self.results = {}
+        for fact in facts:
+            self.add(fact)
+
+    def add(self, fact):
+        """
+        Adds a fact to the knowledge base.
+        """
+        Sentence.validate(fact)
+        self.knowledge.add(fact)
+        self.encoder.add(fact)
+        self.results = {query: True for query, entailed
+                        in self.results.items() if entailed}
+
+    def entails(self, query):
+        """
+        Returns True if the facts so far entail `query`.
+        """
+        entailed = self.results.get(query)
+        if entailed is None:
+            literal = self.encoder.literal(query)
+            entailed = not self.encoder.solver.solve([-literal])
+            self.results[query] = entailed
+        return entailed
+
+    def consistent(self):
+        """
+        Returns True if some model satisfies every fact.
+        """
+        return self.encoder.solver.solve()
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def symbols(self):
+        return self.knowledge.symbols()
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Returns a function of an int `m` that evaluates the sentence, where
+    bit i of `m` is the truth value of symbols[i].
+    """
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    try:
+        return _compile_expression(sentence.expression(index))
+    except (RecursionError, MemoryError, SyntaxError):
+        # Too deeply nested for the compiler, so walk the tree instead
+        return lambda m: sentence.evaluate(
+            {symbol: bool(m >> i & 1) for i, symbol in enumerate(symbols)})
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_expression(expression):
+    """
+    Returns a function of `m` evaluating a generated expression, reusing
+    the compiled function when the same expression comes up again.
+    """
+    return eval(f"lambda m: bool({expression})")
+
+
+def model_check(knowledge, query, method="auto"):
+    """
+    Checks if knowledge base entails query.
+
+    `method` picks the algorithm: "enumerate" walks the sentence trees
+    for each model, "compiled" evaluates every model with compiled
+    sentences, "vector" evaluates whole truth tables at once,
+    "parallel" splits the truth tables across processes, "sat" asks a
+    SAT solver for a model of the knowledge where the query is false,
+    and "auto" picks one by symbol count. A KnowledgeBase answers from
+    its own solver.
+    """
+    if isinstance(knowledge, KnowledgeBase):
+        return knowledge.entails(query)
+    if method == "auto":
+        symbols = set.union(knowledge.symbols(), query.symbols())
+        method = "vector" if len(symbols) <= VECTOR_SYMBOLS else "sat"
+    if method == "compiled":
+        return compiled_model_check(knowledge, query)
+    if method == "vector":
+        return vector_model_check(knowledge, query)
+    if method == "parallel":
+        return parallel_model_check(knowledge, query)
+    if method == "sat":
+        return sat_model_check(knowledge, query)
+    if method != "enumerate":
+        raise ValueError(f"unknown model checking method {method!r}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +696,199 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_all(knowledge, queries, method="auto"):
+    """
+    Returns a list of whether knowledge base entails each query.
+
+    The "vector" and "sat" methods answer every query from one pass
+    over the knowledge base, and "auto" picks between them by symbol
+    count. Other methods check the queries one at a time.
+    """
+    queries = list(queries)
+    if isinstance(knowledge, KnowledgeBase):
+        return [knowledge.entails(query) for query in queries]
+    if method == "auto":
+        symbols = knowledge.symbol_set().union(
+            *[query.symbol_set() for query in queries])
+        method = "vector" if len(symbols) <= VECTOR_SYMBOLS else "sat"
+    if method == "vector":
+        return vector_model_check_all(knowledge, queries)
+    if method == "sat":
+        return sat_model_check_all(knowledge, queries)
+    return [model_check(knowledge, query, method) for query in queries]
+
+
+def compiled_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating a compiled
+    "knowledge implies query" over every model, packed into an int.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    holds = compile_sentence(Implication(knowledge, query), symbols)
+    return all(map(holds, range(1 << len(symbols))))
+
+
+def sat_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by asking a SAT solver for
+    a model of the knowledge base in which the query is false.
+    """
+    encoder = Encoder()
+    encoder.add(knowledge)
+    return not encoder.solver.solve([-encoder.literal(query)])
+
+
+def sat_model_check_all(knowledge, queries):
+    """
+    Checks which queries the knowledge base entails with one SAT
+    solver. Every model found rules out each query false in it, so a
+    query is only solved for when no model so far has refuted it.
+    """
+    encoder = Encoder()
+    encoder.add(knowledge)
+    solver = encoder.solver
+    literals = [encoder.literal(query) for query in queries]
+    if not solver.solve():
+        return [True] * len(literals)
+    entailed = [solver.value(literal) for literal in literals]
+    for i, literal in enumerate(literals):
+        if not entailed[i]:
+            continue
+        if solver.solve([-literal]):
+            for j in range(i, len(literals)):
+                if entailed[j] and not solver.value(literals[j]):
+                    entailed[j] = False
+        else:
+            # Entailed, so later queries may assume it
+            encoder.clause(literal)
+    return entailed
+
+
+def symbol_columns(count):
+    """
+    Returns the truth table columns of `count` symbols over the 2 **
+    count models numbered 0 up: bit j of column i is bit i of j.
+    """
+    size = 1 << count
+    columns = []
+    for i in range(count):
+        # 2 ** i false models then 2 ** i true ones, doubled to size
+        column = ((1 << (1 << i)) - 1) << (1 << i)
+        length = 2 << i
+        while length < size:
+            column |= column << length
+            length <<= 1
+        columns.append(column)
+    return columns
+
+
+def vector_model_check(knowledge, query, assignment=None, stop=None):
+    """
+    Checks if knowledge base entails query by evaluating both over a
+    block of models at once, one bit per model in a big int.
+
+    The first TABLE_BITS symbols vary within a block, and every
+    assignment of the remaining symbols gets its own block, so memory
+    stays bounded however many symbols there are.
+
+    Only models agreeing with `assignment`, a dict of symbol truth
+    values, are checked if it is given. If `stop` is given, the check
+    gives up and returns None once that event is set.
+    """
+    assignment = assignment or {}
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols())
+                     - assignment.keys())
+    bits = min(len(symbols), TABLE_BITS)
+    ones = (1 << (1 << bits)) - 1
+    columns = dict(zip(symbols, symbol_columns(bits)))
+    for symbol, value in assignment.items():
+        columns[symbol] = ones if value else 0
+    fixed = symbols[bits:]
+    for block in range(1 << len(fixed)):
+        if stop is not None and stop.is_set():
+            return None
+        for i, symbol in enumerate(fixed):
+            columns[symbol] = ones if block >> i & 1 else 0
+        models = knowledge.truth_table(columns, ones)
+        if models and models & ~query.truth_table(columns, ones):
+            return False
+    return True
+
+
+def vector_model_check_all(knowledge, queries):
+    """
+    Checks which queries the knowledge base entails, evaluating the
+    knowledge base's truth table once per block for all of them and
+    skipping queries already refuted.
+    """
+    symbols = sorted(knowledge.symbol_set().union(
+        *[query.symbol_set() for query in queries]))
+    bits = min(len(symbols), TABLE_BITS)
+    ones = (1 << (1 << bits)) - 1
+    columns = dict(zip(symbols, symbol_columns(bits)))
+    fixed = symbols[bits:]
+    entailed = [True] * len(queries)
+    remaining = list(range(len(queries)))
+    for block in range(1 << len(fixed)):
+        for i, symbol in enumerate(fixed):
+            columns[symbol] = ones if block >> i & 1 else 0
+        models = knowledge.truth_table(columns, ones)
+        if not models:
+            continue
+        for i in remaining:
+            if models & ~queries[i].truth_table(columns, ones):
+                entailed[i] = False
+        remaining = [i for i in remaining if entailed[i]]
+        if not remaining:
+            break
+    return entailed
+
+
+def parallel_model_check(knowledge, query, workers=None, split=None):
+    """
+    Checks if knowledge base entails query by splitting the models on
+    the first `split` symbols into 2 ** split truth table checks, run
+    across `workers` processes. Every worker stops as soon as one of
+    them finds a model of the knowledge base where the query is false.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    workers = workers or os.cpu_count()
+    if split is None:
+        # Several subproblems per worker keep the pool balanced
+        split = (4 * workers - 1).bit_length()
+    split = min(split, len(symbols))
+    if workers <= 1 or split == 0:
+        return vector_model_check(knowledge, query)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    stop = context.Event()
+    pool = context.Pool(workers, initializer=_start_worker,
+                        initargs=(knowledge, query, symbols[:split], stop))
+    with pool:
+        for holds in pool.imap_unordered(_check_split, range(1 << split)):
+            if holds is False:
+                stop.set()
+                return False
+    return True
+
+
+def _start_worker(knowledge, query, symbols, stop):
+    global _worker
+    _worker = (knowledge, query, symbols, stop)
+
+
+def _check_split(index):
+    """
+    Checks the models where bit i of `index` is the value of the i-th
+    split symbol. Returns None if another worker already found a
+    counter-model.
+    """
+    knowledge, query, symbols, stop = _worker
+    assignment = {symbol: bool(index >> i & 1)
+                  for i, symbol in enumerate(symbols)}
+    return vector_model_check(knowledge, query, assignment, stop)
@@ -0,0 +1,324 @@
+"""
+CDCL SAT solver over CNF clauses of integer literals.
+
+Variables are numbered from 1, and literal -v is the negation of v.
+The solver propagates units with two watched literals per clause,
+learns a first-UIP clause from every conflict, picks decisions by
+variable activity with saved phases, and restarts on a geometric
+schedule. Clauses can be added between calls to solve(), and learnt
+clauses are kept, so one solver can answer many related queries.
+"""
+import heapq
+
+
+class Solver():
+
+    def __init__(self):
+        self.clauses = []
+        self.learnts = []
+
+        # Per-variable state, indexed by variable number
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+
+        # Clauses watching each literal
+        self.watches = {}
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+
+        self.order = []
+        self.increment = 1.0
+        self.ok = True
+        self.model = None
+
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    @property
+    def num_variables(self):
+        return len(self.values) - 1
+
+    def new_variable(self):
+        """
+        Returns a new variable.
+        """
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        variable = len(self.values) - 1
+        self.watches[variable] = []
+        self.watches[-variable] = []
+        heapq.heappush(self.order, (0.0, variable))
+        return variable
+
+    def add_clause(self, literals):
+        """
+        Adds a clause (an iterable of literals, at least one of which
+        must be true). Returns False if the clauses are now known to be
+        unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self._backtrack(0)
+
+        clause = []
+        for literal in literals:
+            value = self._value(literal)
+            if value == 1 or -literal in clause:
+                # Already satisfied, or a tautology
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self._assign(clause[0], None)
+            if self._propagate() is not None:
+                self.ok = False
+        else:
+            self.clauses.append(clause)
+            self._watch(clause)
+        return self.ok
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses and the assumed literals can all be
+        satisfied, leaving a satisfying assignment in self.model, and
+        False otherwise. Assumptions hold for this call only.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self._backtrack(0)
+        if self._propagate() is not None:
+            self.ok = False
+            return False
+
+        restart_limit = 100
+        conflicts = 0
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.ok = False
+                    return False
+                learnt, level = self._analyze(conflict)
+                self._backtrack(level)
+                if len(learnt) == 1:
+                    self._assign(learnt[0], None)
+                else:
+                    self.learnts.append(learnt)
+                    self._watch(learnt)
+                    self._assign(learnt[0], learnt)
+                self.increment /= 0.95
+                continue
+
+            if conflicts >= restart_limit:
+                conflicts = 0
+                restart_limit = int(restart_limit * 1.5)
+                self._backtrack(0)
+                continue
+
+            # Assumptions take the first decision levels, one each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self._value(literal)
+                if value == -1:
+                    self._backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value == 0:
+                    self._assign(literal, None)
+                continue
+
+            literal = self._decide()
+            if literal is None:
+                self.model = list(self.values)
+                self._backtrack(0)
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self._assign(literal, None)
+
+    def value(self, literal):
+        """
+        Returns True or False for a literal in the last model found.
+        """
+        value = self.model[abs(literal)]
+        return value > 0 if literal > 0 else value < 0
+
+    def _value(self, literal):
+        """
+        Returns 1 if a literal is currently true, -1 if false, else 0.
+        """
+        if literal > 0:
+            return self.values[literal]
+        return -self.values[-literal]
+
+    def _watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def _assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def _propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a clause
+        with every literal false if there is a conflict, else None.
+        """
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+        while self.head < len(trail):
+            false_literal = -trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            watching = watches[false_literal]
+            kept = 0
+            i = 0
+            n = len(watching)
+            while i < n:
+                clause = watching[i]
+                i += 1
+
+                # Keep the false watched literal second
+                if clause[0] == false_literal:
+                    clause[0] = clause[1]
+                    clause[1] = false_literal
+                first = clause[0]
+                first_value = values[first] if first > 0 else -values[-first]
+                if first_value == 1:
+                    watching[kept] = clause
+                    kept += 1
+                    continue
+
+                # Look for another literal that is not false to watch
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (values[literal] if literal > 0
+                            else -values[-literal]) != -1:
+                        clause[1] = literal
+                        clause[k] = false_literal
+                        watches[literal].append(clause)
+                        break
+                else:
+                    watching[kept] = clause
+                    kept += 1
+                    if first_value == -1:
+                        while i < n:
+                            watching[kept] = watching[i]
+                            kept += 1
+                            i += 1
+                        del watching[kept:]
+                        self.head = len(trail)
+                        return clause
+                    self._assign(first, clause)
+            del watching[kept:]
+        return None
+
+    def _analyze(self, conflict):
+        """
+        Returns (learnt clause, level to backtrack to) for a conflict.
+        The learnt clause's first literal is the negated first unique
+        implication point, which becomes true after backtracking.
+        """
+        levels = self.levels
+        trail = self.trail
+        level = len(self.trail_limits)
+        seen = set()
+        learnt = [None]
+        pending = 0
+        literal = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                if other == literal:
+                    continue
+                variable = abs(other)
+                if variable not in seen and levels[variable] > 0:
+                    seen.add(variable)
+                    self._bump(variable)
+                    if levels[variable] == level:
+                        pending += 1
+                    else:
+                        learnt.append(other)
+
+            # Resolve on the latest conflicting literal of this level
+            while abs(trail[index]) not in seen:
+                index -= 1
+            literal = trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+        learnt[0] = -literal
+
+        if len(learnt) == 1:
+            return learnt, 0
+        deepest = max(range(1, len(learnt)),
+                      key=lambda i: levels[abs(learnt[i])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, levels[abs(learnt[1])]
+
+    def _bump(self, variable):
+        activity = self.activity
+        activity[variable] += self.increment
+        if activity[variable] > 1e100:
+            for v in range(1, len(activity)):
+                activity[v] *= 1e-100
+            self.increment *= 1e-100
+            self.order = [(-activity[v], v) for v in range(1, len(activity))
+                          if self.values[v] == 0]
+            heapq.heapify(self.order)
+        elif self.values[variable] == 0:
+            heapq.heappush(self.order, (-activity[variable], variable))
+
+    def _decide(self):
+        """
+        Returns the saved phase of the most active unassigned variable,
+        or None if every variable is assigned.
+        """
+        values = self.values
+        order = self.order
+        while order:
+            variable = heapq.heappop(order)[1]
+            if values[variable] == 0:
+                return variable if self.phase[variable] else -variable
+        return None
+
+    def _backtrack(self, level):
+        """
+        Undoes every assignment above decision level `level`.
+        """
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phase[variable] = literal > 0
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = start
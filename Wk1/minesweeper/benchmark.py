@@ -0,0 +1,225 @@
+"""
+Checks MinesweeperAI against simple reference implementations, then
+measures how long MinesweeperAI.add_knowledge takes per move as a game
+on a large board goes on, and how fast and how well the AI guesses.
+
+The checks play random moves on small boards. After every move, the
+AI's known mines and safes must match the all-pairs subset inference
+it replaced, and its mine probabilities must match those found by
+enumerating every placement of mines in the unknown cells.
+
+The AI plays until every safe cell is revealed. When a guess hits a
+mine, the mine is marked and play goes on, so the whole board is
+explored. Moves are grouped into tenths of the game, and the mean and
+slowest add_knowledge time of each tenth is printed. Then games on an
+expert board are played to the first mine hit, with and without the
+AI knowing the number of mines, to report the win rate and the time
+each guess takes.
+
+Usage: python benchmark.py [--height H] [--width W] [--mines M]
+                           [--games N] [--checks N]
+"""
+import argparse
+import itertools
+import random
+import time
+from fractions import Fraction
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(height, width, mines, seed=None, informed=True, stop=False):
+    """
+    Plays one game, returning the seconds add_knowledge took on every
+    move, the seconds each guess took, and the number of mines hit.
+    The AI is told the number of mines if `informed`, and the game
+    ends at the first mine hit if `stop`.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width,
+                       mines=mines if informed else None)
+    safe_cells = height * width - mines
+    timings = []
+    guesses = []
+    hit = 0
+    while len(ai.moves_made) < safe_cells:
+        move = ai.make_safe_move()
+        if move is None:
+            start = time.perf_counter()
+            move = ai.make_random_move()
+            guesses.append(time.perf_counter() - start)
+        if game.is_mine(move):
+            hit += 1
+            if stop:
+                break
+            ai.mark_mine(move)
+            continue
+        nearby = game.nearby_mines(move)
+        start = time.perf_counter()
+        ai.add_knowledge(move, nearby)
+        timings.append(time.perf_counter() - start)
+    return timings, guesses, hit
+
+
+def neighbors(cell, height, width):
+    """
+    Returns the cells next to `cell` on the board.
+    """
+    i, j = cell
+    return {(a, b) for a in range(max(i - 1, 0), min(i + 2, height))
+            for b in range(max(j - 1, 0), min(j + 2, width))
+            if (a, b) != cell}
+
+
+def fixpoint_inference(height, width, revealed):
+    """
+    Returns (mines, safes) known from `revealed`, a dict of cells to
+    their counts, by the all-pairs subset inference run to a fixpoint.
+    """
+    mines = set()
+    safes = set(revealed)
+    sentences = [(neighbors(cell, height, width), count)
+                 for cell, count in revealed.items()]
+    changed = True
+    while changed:
+        changed = False
+        reduced = []
+        for cells, count in sentences:
+            count -= len(cells & mines)
+            cells = cells - mines - safes
+            if not cells:
+                continue
+            if count == 0 or count == len(cells):
+                (mines if count else safes).update(cells)
+                changed = True
+            elif (cells, count) not in reduced:
+                reduced.append((cells, count))
+        sentences = reduced
+        for (cells, count), (other, other_count) in itertools.product(
+                sentences, repeat=2):
+            if cells < other and (other - cells,
+                                  other_count - count) not in sentences:
+                sentences.append((other - cells, other_count - count))
+                changed = True
+    return mines, safes
+
+
+def brute_force_probabilities(ai, height, width, revealed, mines):
+    """
+    Returns the probability that each unknown cell is a mine, counting
+    every placement of mines in the unknown cells consistent with
+    `revealed` (and with `mines` mines in all, if it is not None).
+    """
+    unknown = sorted(ai.unknown)
+    counts = dict.fromkeys(unknown, 0)
+    total = 0
+    for bits in itertools.product((False, True), repeat=len(unknown)):
+        placed = {cell for cell, bit in zip(unknown, bits) if bit}
+        placed |= ai.mines
+        if mines is not None and len(placed) != mines:
+            continue
+        if all(len(neighbors(cell, height, width) & placed) == count
+               for cell, count in revealed.items()):
+            total += 1
+            for cell in placed - ai.mines:
+                counts[cell] += 1
+    return {cell: Fraction(count, total) for cell, count in counts.items()}
+
+
+def check(boards, seed=0):
+    """
+    Plays random safe moves on `boards` small boards, checking the AI's
+    inference and probabilities after every move.
+    """
+    rng = random.Random(seed)
+    for board in range(boards):
+        height, width = rng.randint(2, 4), rng.randint(2, 4)
+        mines = rng.randint(1, height * width // 2)
+        random.seed(seed + board)
+        game = Minesweeper(height=height, width=width, mines=mines)
+        informed = board % 2 == 0
+        ai = MinesweeperAI(height=height, width=width,
+                           mines=mines if informed else None)
+        cells = [(i, j) for i in range(height) for j in range(width)
+                 if not game.is_mine((i, j))]
+        rng.shuffle(cells)
+        revealed = {}
+        for cell in cells:
+            if cell in ai.moves_made:
+                continue
+            revealed[cell] = game.nearby_mines(cell)
+            ai.add_knowledge(cell, revealed[cell])
+            if (ai.mines, ai.safes) != fixpoint_inference(height, width,
+                                                          revealed):
+                raise AssertionError("MinesweeperAI inference disagrees "
+                                     "with the all-pairs inference")
+
+            probabilities, other = ai.mine_probabilities()
+            expected = brute_force_probabilities(
+                ai, height, width, revealed, mines if informed else None)
+            for cell, probability in expected.items():
+                if cell in probabilities:
+                    found = probabilities[cell]
+                elif informed:
+                    found = other
+                else:
+                    # Even odds for cells in no sentence are a guess
+                    continue
+                if found != probability:
+                    raise AssertionError("MinesweeperAI mine probabilities "
+                                         "disagree with enumeration")
+    print(f"Checked {boards} small boards against the all-pairs "
+          f"inference and enumerated probabilities")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time MinesweeperAI inference on a large board.")
+    parser.add_argument("--height", type=int, default=100)
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--mines", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--games", type=int, default=100,
+                        help="expert games to play for the win rate")
+    parser.add_argument("--checks", type=int, default=200,
+                        help="small boards to check the AI on")
+    args = parser.parse_args()
+
+    check(args.checks, args.seed)
+
+    start = time.perf_counter()
+    timings, guesses, hit = play(args.height, args.width, args.mines,
+                                 args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.height}x{args.width} board, {args.mines} mines: "
+          f"{len(timings)} moves in {elapsed:.2f}s, {len(guesses)} guesses "
+          f"in {sum(guesses):.2f}s, {hit} mines hit")
+    print(f"  {'moves':>13} {'mean ms':>9} {'slowest ms':>11}")
+    for tenth in range(10):
+        part = timings[len(timings) * tenth // 10:
+                       len(timings) * (tenth + 1) // 10]
+        if part:
+            first = len(timings) * tenth // 10 + 1
+            print(f"  {first:>6}-{first + len(part) - 1:<6} "
+                  f"{sum(part) / len(part) * 1e3:9.3f} "
+                  f"{max(part) * 1e3:11.3f}")
+
+    print(f"Expert board, 16x30 with 99 mines, {args.games} games")
+    print(f"  {'mine count':>10} {'won':>5} {'guesses':>8} "
+          f"{'mean ms':>9} {'slowest ms':>11}")
+    for informed in (True, False):
+        won = 0
+        times = []
+        for game in range(args.games):
+            _, guesses, hit = play(16, 30, 99, args.seed + game, informed,
+                                   stop=True)
+            won += not hit
+            times.extend(guesses)
+        print(f"  {'known' if informed else 'unknown':>10} {won:>5} "
+              f"{len(times):>8} {sum(times) / len(times) * 1e3:9.3f} "
+              f"{max(times) * 1e3:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
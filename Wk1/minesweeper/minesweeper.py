@@ -1,6 +1,8 @@
 import itertools
+import math
 import random
 import copy
+from fractions import Fraction
 
 
 class Minesweeper():
@@ -144,16 +146,116 @@ class Sentence():
             self.cells.remove(cell)
 
 
+def count_assignments(cells, constraints):
+    """
+    Counts the ways to place mines in `cells`, a list, so that each
+    (cells, count) constraint over them holds.
+
+    Returns (ways, mine_ways), where ways[m] is the number of
+    placements with m mines, and mine_ways[cell][m] the number of those
+    with a mine in `cell`.
+
+    Cells are decided in order, and placements of the cells so far that
+    leave the same counts to fill in every unfinished constraint are
+    merged, so the work grows with how many constraints are unfinished
+    at once rather than exponentially in the number of cells. Counts of
+    placements into each merged state are found going forward, and of
+    completions from it going backward.
+    """
+    n = len(cells)
+    position = {cell: i for i, cell in enumerate(cells)}
+    constraints = [(sorted(position[cell] for cell in group), count)
+                   for group, count in constraints]
+    first = [positions[0] for positions, _ in constraints]
+    last = [positions[-1] for positions, _ in constraints]
+
+    # Constraints with each cell, and how many of their cells come after
+    members = [[] for _ in range(n)]
+    for k, (positions, _) in enumerate(constraints):
+        for left, i in enumerate(reversed(positions)):
+            members[i].append((k, left))
+    # Constraints started and unfinished after deciding each cell
+    active = [[k for k in range(len(constraints))
+               if first[k] <= i < last[k]] for i in range(n)]
+
+    forward = [{(): [1]}]
+    steps = []
+    for i in range(n):
+        before = active[i - 1] if i else []
+        layer = {}
+        step = []
+        for state, ways in forward[i].items():
+            remaining = dict(zip(before, state))
+            for mine in (0, 1):
+                after = dict(remaining)
+                for k, left in members[i]:
+                    need = after.get(k, constraints[k][1]) - mine
+                    if not 0 <= need <= left:
+                        break
+                    after[k] = need
+                else:
+                    new = tuple(after[k] for k in active[i])
+                    step.append((state, mine, new))
+                    layer[new] = _add(layer.get(new), [0] * mine + ways)
+        forward.append(layer)
+        steps.append(step)
+
+    backward = {(): [1]}
+    mine_ways = {}
+    for i in range(n - 1, -1, -1):
+        layer = {}
+        total = None
+        for state, mine, new in steps[i]:
+            completions = backward.get(new)
+            if completions is None:
+                continue
+            completions = [0] * mine + completions
+            layer[state] = _add(layer.get(state), completions)
+            if mine:
+                total = _add(total, _multiply(forward[i][state],
+                                              completions))
+        mine_ways[cells[i]] = total or [0]
+        backward = layer
+    return forward[n].get((), [0]), mine_ways
+
+
+def _add(a, b):
+    """Returns the sum of two polynomials, lists of coefficients."""
+    if a is None:
+        return b
+    if len(a) < len(b):
+        a, b = b, a
+    a = list(a)
+    for i, x in enumerate(b):
+        a[i] += x
+    return a
+
+
+def _multiply(a, b):
+    """Returns the product of two polynomials."""
+    product = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                product[i + j] += x * y
+    return product
+
+
+def _choose(n, k):
+    return math.comb(n, k) if 0 <= k <= n else 0
+
+
 class MinesweeperAI():
     """
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None):
 
-        # Set initial height and width
+        # Set initial height and width, and the number of mines if known
         self.height = height
         self.width = width
+        self.mine_count = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -162,26 +264,41 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Cells not known to be safe or mines
+        self.unknown = set(itertools.product(range(height), range(width)))
+
+        # Sentences about the game known to be true, keyed by their
+        # (frozenset of cells, count), so equal sentences are kept once
+        self.knowledge = {}
+
+        # Keys of the sentences that mention each cell
+        self.containing = {}
+
+        # Inference still to do: keys of sentences not yet compared to
+        # the sentences they overlap, and (cell, is mine) conclusions
+        # not yet applied to the knowledge
+        self.pending = []
+        self.conclusions = []
+
+        # count_assignments results of the last move's components, keyed
+        # by the frozenset of their sentences' keys
+        self.counted = {}
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.conclusions.append((cell, True))
+        self.infer()
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
-        self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        self.conclusions.append((cell, False))
+        self.infer()
 
     def add_knowledge(self, cell, count):
         """
@@ -198,84 +315,97 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
-        
         self.moves_made.add(cell)
-        self.mark_safe(cell)
-
-        # generating neighbors
-        neighbors = set()   
-
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # if cell is a mine, update count and do not add to neighbors
-                if (i,j) in self.mines:
-                    count = count - 1
-                    continue
-
-                # if cell is a safe, do not add to neighbors
-                if (i,j) in self.safes:
-                    continue
+        self.conclusions.append((cell, False))
 
-                # if cell is not the original cell, and is within the boundaries of the game, add to neighbors
-                if (i,j) != cell and 0 <= i < self.height and 0 <= j < self.width:
-                    neighbors.add((i,j))
-
-        print('neighbors', neighbors)
-
-        # adding new knowledge (only undetermined cells)
-        if len(neighbors) != 0:
-            new_k = Sentence(neighbors, count)
-            self.knowledge.append(new_k)
-            print('new sentence', new_k)
-
-        added_new_knowledge = True
-
-        # if knowledge base is updated, try to make new inferences
-        while added_new_knowledge == True:
-            added_new_knowledge = False
-            
-            # updating safes and mines based on new sentence
-            new_safes = set()
-            new_mines = set()
-
-            # find all known safes and mines based on currrent knowledge
-            for k in self.knowledge:
-                new_safes.update(k.known_safes())
-                new_mines.update(k.known_mines())
-
-            # extract new safes and mines (known but not yet added to AI)
-            new_safes.difference_update(self.safes)
-            new_mines.difference_update(self.mines)
-
-            # mark new safes and mines if they exist
-            # set added_new_knowledge to True so the AI can try to infer new knowledge based on newly marked safes and mines 
-            if len(new_safes) != 0:
-                for s in new_safes.copy():
-                    self.mark_safe(s)
-                added_new_knowledge = True
-            if len(new_mines) != 0:
-                for m in new_mines.copy():
-                    self.mark_mine(m)
-                added_new_knowledge = True
-            
-            # remove empty sentences
-            self.knowledge = [k for k in self.knowledge if k != Sentence(set(), 0)]
-
-            # loop through all sentences to see if there is a subset
-            for k1 in self.knowledge:
-                for k2 in self.knowledge:
-                    if k1.cells.issubset(k2.cells) and k1.cells != k2.cells:
-                        new_k_cells = k2.cells - k1.cells
-                        new_k_count = k2.count - k1.count
-                        new_sentence = Sentence(new_k_cells, new_k_count)
-
-                        # if sentence is not already in knowledge, add to knowledge
-                        if new_sentence not in self.knowledge and len(new_sentence.cells) > 0:
-                            self.knowledge.append(new_sentence)
-                            print('new sentence', new_sentence)
-                            added_new_knowledge = True
+        neighbors = set()
+        for i in range(max(cell[0] - 1, 0), min(cell[0] + 2, self.height)):
+            for j in range(max(cell[1] - 1, 0), min(cell[1] + 2, self.width)):
+                if (i, j) != cell:
+                    neighbors.add((i, j))
+        self.add_sentence(neighbors, count)
+        self.infer()
 
+    def add_sentence(self, cells, count):
+        """
+        Adds the sentence that `count` of `cells` are mines, less the
+        cells already known, unless an equal sentence is known. Cells
+        of a sentence that are all safe or all mines become conclusions
+        instead.
+        """
+        cells = set(cells)
+        mines = cells & self.mines
+        cells -= mines
+        cells -= self.safes
+        count -= len(mines)
+        if not cells:
+            return
+        if count == 0 or count == len(cells):
+            self.conclusions.extend((c, count > 0) for c in cells)
+            return
+
+        key = (frozenset(cells), count)
+        if key in self.knowledge:
+            return
+        self.knowledge[key] = Sentence(cells, count)
+        for c in cells:
+            self.containing.setdefault(c, set()).add(key)
+        self.pending.append(key)
+
+    def remove_sentence(self, key):
+        """Removes the sentence with `key` from the knowledge and index."""
+        del self.knowledge[key]
+        for c in key[0]:
+            keys = self.containing.get(c)
+            if keys is not None:
+                keys.discard(key)
+
+    def infer(self):
+        """
+        Applies every conclusion and compares every new sentence to the
+        sentences sharing a cell with it, until nothing more follows.
+        Only sentences touched by a change are looked at again.
+        """
+        while self.conclusions or self.pending:
+            if self.conclusions:
+                self.conclude(*self.conclusions.pop())
+                continue
+
+            key = self.pending.pop()
+            if key not in self.knowledge:
+                continue
+            cells, count = key
+
+            # A subset or superset of this sentence shares its cells
+            related = set()
+            for c in cells:
+                related.update(self.containing.get(c, ()))
+            related.discard(key)
+            for other_cells, other_count in related:
+                if other_cells < cells:
+                    self.add_sentence(cells - other_cells,
+                                      count - other_count)
+                elif cells < other_cells:
+                    self.add_sentence(other_cells - cells,
+                                      other_count - count)
+
+    def conclude(self, cell, mine):
+        """
+        Records that `cell` is a mine or safe, and replaces each
+        sentence mentioning it with one about the other cells.
+        """
+        if cell in self.mines or cell in self.safes:
+            return
+        if mine:
+            self.mines.add(cell)
+        else:
+            self.safes.add(cell)
+        self.unknown.discard(cell)
+        for key in self.containing.pop(cell, ()):
+            if key in self.knowledge:
+                self.remove_sentence(key)
+                cells, count = key
+                self.add_sentence(cells - {cell}, count - mine)
 
     def make_safe_move(self):
         """
@@ -297,17 +427,129 @@ class MinesweeperAI():
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Chooses the cell least likely to be a mine among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        
-        for i in range(0, self.height):
-            for j in range(0, self.width):
-                move = (i, j)
-                if move not in self.moves_made and move not in self.mines:
-                    return move
-        
-        return None
-                
-        raise NotImplementedError
+        if not self.unknown:
+            return self.make_safe_move()
+        probabilities, other = self.mine_probabilities()
+        best = min(probabilities, key=probabilities.get, default=None)
+        if best is None or (other is not None
+                            and other < probabilities[best]):
+            for cell in self.unknown:
+                if cell not in probabilities:
+                    return cell
+        return best
+
+    def mine_probabilities(self):
+        """
+        Returns (probabilities, other): a dict of the probability that
+        each unknown cell in some sentence is a mine, and the
+        probability for any other unknown cell, or None if there is
+        none.
+
+        Sentences are split into components that share no cells, and the
+        mine placements of each are counted with count_assignments. When
+        the number of mines on the board is known, a placement with m
+        mines in sentences is weighted by the ways to place the mines
+        left among the U cells in no sentence, C(U, mines left - m).
+        Otherwise every placement counts once, and other cells are given
+        even odds.
+        """
+        components = []
+        counted = {}
+        for keys in self.components():
+            group = frozenset(keys)
+            result = self.counted.get(group)
+            if result is None:
+                cells = self.frontier_order(keys)
+                result = (cells, *count_assignments(cells, keys))
+            counted[group] = result
+            components.append(result)
+        self.counted = counted
+
+        frontier = sum(len(cells) for cells, _, _ in components)
+        unmentioned = len(self.unknown) - frontier
+        if self.mine_count is None:
+            probabilities = {}
+            for _, ways, mine_ways in components:
+                total = sum(ways)
+                for cell, counts in mine_ways.items():
+                    probabilities[cell] = Fraction(sum(counts), total)
+            return probabilities, Fraction(1, 2) if unmentioned else None
+
+        # Ways to place the mines left outside the sentences, given how
+        # many are in them
+        left = self.mine_count - len(self.mines)
+        outside = [_choose(unmentioned, left - m) for m in range(frontier + 1)]
+
+        # Placements by mine count in the components before and after each
+        prefixes = [[1]]
+        for _, ways, _ in components:
+            prefixes.append(_multiply(prefixes[-1], ways))
+        suffix = [1]
+        probabilities = {}
+        total = sum(p * c for p, c in zip(prefixes[-1], outside))
+        for k in range(len(components) - 1, -1, -1):
+            cells, ways, mine_ways = components[k]
+            others = _multiply(prefixes[k], suffix)
+            weights = [sum(p * outside[m + t] for t, p in enumerate(others))
+                       for m in range(len(ways))]
+            for cell, counts in mine_ways.items():
+                probabilities[cell] = Fraction(
+                    sum(c * w for c, w in zip(counts, weights)), total)
+            suffix = _multiply(suffix, ways)
+
+        other = None
+        if unmentioned:
+            other = Fraction(sum(p * _choose(unmentioned - 1, left - t - 1)
+                                 for t, p in enumerate(prefixes[-1])), total)
+        return probabilities, other
+
+    def components(self):
+        """
+        Returns lists of the keys of sentences that are connected by
+        sharing cells, directly or through other sentences.
+        """
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for cells, _ in self.knowledge:
+            cells = iter(cells)
+            root = next(cells)
+            parent.setdefault(root, root)
+            root = find(root)
+            for cell in cells:
+                parent.setdefault(cell, cell)
+                other = find(cell)
+                if other != root:
+                    parent[other] = root
+
+        groups = {}
+        for key in self.knowledge:
+            groups.setdefault(find(next(iter(key[0]))), []).append(key)
+        return list(groups.values())
+
+    def frontier_order(self, keys):
+        """
+        Returns the cells of connected sentences in breadth-first order
+        from a cell in the fewest sentences, so that sentences are
+        finished soon after they are started.
+        """
+        cells = set().union(*[key[0] for key in keys])
+        start = min(cells, key=lambda cell: len(self.containing[cell]))
+        order = [start]
+        seen = {start}
+        for cell in order:
+            for key in self.containing[cell]:
+                for other in key[0]:
+                    if other not in seen:
+                        seen.add(other)
+                        order.append(other)
+        return order
@@ -1,6 +1,7 @@
 import pygame
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from minesweeper import Minesweeper, MinesweeperAI
 
@@ -37,9 +38,42 @@ flag = pygame.transform.scale(flag, (cell_size, cell_size))
 mine = pygame.image.load("assets/images/mine.png")
 mine = pygame.transform.scale(mine, (cell_size, cell_size))
 
+
+def choose_move(ai):
+    """
+    Returns (move, safe, known mines) for the AI's next move, where
+    move is None if there are no moves left.
+    """
+    move = ai.make_safe_move()
+    if move is not None:
+        return move, True, ai.mines.copy()
+    return ai.make_random_move(), False, ai.mines.copy()
+
+
+def reveal(move):
+    """
+    Reveals a cell and queues its count for the AI. Returns False if
+    the cell is a mine.
+    """
+    if game.is_mine(move):
+        return False
+    revealed.add(move)
+    working.append(executor.submit(ai.add_knowledge, move,
+                                   game.nearby_mines(move)))
+    return True
+
+
+# The AI runs on one worker thread, so its calls stay in order while
+# the window keeps drawing and handling events
+executor = ThreadPoolExecutor(max_workers=1)
+
 # Create game and AI agent
 game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
+
+# Futures of AI calls not yet finished, and of the requested AI move
+working = []
+pending = None
 
 # Keep track of revealed cells, flagged cells, and if a mine was hit
 revealed = set()
@@ -49,11 +83,15 @@ lost = False
 # Show instructions initially
 instructions = True
 
+clock = pygame.time.Clock()
+
 while True:
 
     # Check if game quit
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            for future in working:
+                future.cancel()
             sys.exit()
 
     screen.fill(BLACK)
@@ -96,6 +134,7 @@ while True:
                 time.sleep(0.3)
 
         pygame.display.flip()
+        clock.tick(60)
         continue
 
     # Draw board
@@ -152,8 +191,19 @@ while True:
     pygame.draw.rect(screen, WHITE, resetButton)
     screen.blit(buttonText, buttonRect)
 
+    # Finished AI calls re-raise any error they hit
+    for future in working:
+        if future.done():
+            future.result()
+    working = [future for future in working if not future.done()]
+    thinking = bool(working)
+
     # Display text
-    text = "Lost" if lost else "Won" if game.mines == flags else ""
+    if thinking:
+        dots = "." * (pygame.time.get_ticks() // 400 % 4)
+        text = f"Thinking{dots:<3}"
+    else:
+        text = "Lost" if lost else "Won" if game.mines == flags else ""
     text = mediumFont.render(text, True, WHITE)
     textRect = text.get_rect()
     textRect.center = ((5 / 6) * width, (2 / 3) * height)
@@ -161,6 +211,24 @@ while True:
 
     move = None
 
+    # Make the AI's move once it has chosen one, so the AI records it
+    # before it is asked for anything else
+    if pending is not None and pending.done():
+        ai_move, safe, known_mines = pending.result()
+        pending = None
+        if lost:
+            # The game ended while the AI was thinking
+            pass
+        elif ai_move is None:
+            flags = known_mines
+            print("No moves left to make.")
+        else:
+            if safe:
+                print("AI making safe move.")
+            else:
+                print("No known safe moves, AI making random move.")
+            lost = not reveal(ai_move)
+
     left, _, right = pygame.mouse.get_pressed()
 
     # Check for a right-click to toggle flagging
@@ -178,31 +246,28 @@ while True:
     elif left == 1:
         mouse = pygame.mouse.get_pos()
 
-        # If AI button clicked, make an AI move
+        # If AI button clicked, ask the AI for a move
         if aiButton.collidepoint(mouse) and not lost:
-            move = ai.make_safe_move()
-            if move is None:
-                move = ai.make_random_move()
-                if move is None:
-                    flags = ai.mines.copy()
-                    print("No moves left to make.")
-                else:
-                    print("No known safe moves, AI making random move.")
-            else:
-                print("AI making safe move.")
+            if not working:
+                pending = executor.submit(choose_move, ai)
+                working.append(pending)
             time.sleep(0.2)
 
-        # Reset game state
+        # Reset game state, dropping the old AI's unfinished work
         elif resetButton.collidepoint(mouse):
+            for future in working:
+                future.cancel()
+            working = []
+            pending = None
             game = Minesweeper(height=HEIGHT, width=WIDTH, mines=MINES)
-            ai = MinesweeperAI(height=HEIGHT, width=WIDTH)
+            ai = MinesweeperAI(height=HEIGHT, width=WIDTH, mines=MINES)
             revealed = set()
             flags = set()
             lost = False
             continue
 
-        # User-made move
-        elif not lost:
+        # User-made move, once the AI has caught up
+        elif not lost and not thinking:
             for i in range(HEIGHT):
                 for j in range(WIDTH):
                     if (cells[i][j].collidepoint(mouse)
@@ -212,11 +277,7 @@ while True:
 
     # Make move and update AI knowledge
     if move:
-        if game.is_mine(move):
-            lost = True
-        else:
-            nearby = game.nearby_mines(move)
-            revealed.add(move)
-            ai.add_knowledge(move, nearby)
+        lost = not reveal(move)
 
     pygame.display.flip()
+    clock.tick(60)